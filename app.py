@@ -276,11 +276,14 @@ class CreatorWorker(QThread):
     remaining_links_count = pyqtSignal(int)
     processed_stats = pyqtSignal(int, int)
     video_finished = pyqtSignal(list)  # <-- YENİ EKLENEN SİNYAL (Köprü)
+    prefetch_status = pyqtSignal(int, float)
+    encode_status = pyqtSignal(int, int, int)
 
-    def __init__(self, settings, parent=None):
+    def __init__(self, settings, link_queue=None, parent=None):
         super().__init__(parent)
         self.stop_event = threading.Event()
         self.settings = settings
+        self.link_queue = link_queue
 
     def run(self):
         try:
@@ -290,6 +293,8 @@ class CreatorWorker(QThread):
             worker_signals.progress.connect(self.progress)
             worker_signals.remaining_links_count.connect(self.remaining_links_count)
             worker_signals.processed_stats.connect(self.processed_stats)
+            worker_signals.prefetch_status.connect(self.prefetch_status)
+            worker_signals.encode_status.connect(self.encode_status)
             
             # --- YENİ SİNYAL BAĞLANTISI ---
             # Core'dan gelen video bitti sinyalini, Arayüze ilet
@@ -318,7 +323,9 @@ class CreatorWorker(QThread):
                 self.stop_event,
                 enable_overlay=enable_overlay,
                 hardware_accel=hardware_accel,
-                max_limit=max_limit
+                max_limit=max_limit,
+                settings=self.settings,
+                link_queue=self.link_queue
             )
             self.finished.emit(success, msg, v_id, meta)
             
@@ -345,7 +352,8 @@ class UploaderWorker(QThread):
         try:
             self.log_message.emit(f"🚀 Starting YouTube upload process ({self.privacy_status})...")
             # privacy_status iletiliyor
-            youtube_uploader.upload_videos(self.metadata_list, uploader_config.CHANNEL_CONFIGS, self.log_message.emit, self.privacy_status)
+            youtube_uploader.upload_videos(self.metadata_list, uploader_config.CHANNEL_CONFIGS, self.log_message.emit, self.privacy_status,
+                                           on_uploaded=creator_core.record_upload)
             self.finished.emit(True, "✅ YouTube upload process completed successfully.")
         except Exception as e:
             error_msg = f"Uploader worker error: {e}\n{traceback.format_exc()}"
@@ -398,9 +406,11 @@ class SettingsDialog(QDialog):
         self.links_file_input = self.create_path_selector("links_file", "Links File (link.txt):", True)
         self.used_links_file_input = self.create_path_selector("used_links_file", "Used Links File (used_link.txt):", True)
         self.output_dir_input = self.create_path_selector("output_dir", "Output Directory:", False)
+        self.source_cache_dir_input = self.create_path_selector("source_cache_dir", "Source Cache (empty = output dir):", False)
         layout.addRow(self.links_file_input[0], self.links_file_input[1])
         layout.addRow(self.used_links_file_input[0], self.used_links_file_input[1])
         layout.addRow(self.output_dir_input[0], self.output_dir_input[1])
+        layout.addRow(self.source_cache_dir_input[0], self.source_cache_dir_input[1])
         return widget
 
     def create_path_selector(self, key, label, is_file):
@@ -435,8 +445,40 @@ class SettingsDialog(QDialog):
         layout.addRow("Video Download Quality:", self.quality_combo)
         layout.addRow("Processing Hardware:", self.hardware_combo) # Eklendi
         layout.addRow("FFmpeg Preset (Speed vs Size):", self.preset_combo)
+
+        # --- Boru hattı (pipeline) paralellik ayarları ---
+        workers = creator_core.get_processing_setting(self.settings, "pipeline_workers")
+        self.stage_spins = {}
+        for stage, label in [("download", "Parallel Downloads:"), ("metadata", "Parallel AI Jobs:")]:
+            spin = QSpinBox(); spin.setRange(1, 16); spin.setValue(workers[stage])
+            self.stage_spins[stage] = spin
+            layout.addRow(label, spin)
+        # Paralel encode sayısı encode slotlarıdır (ayrı bir "Parallel Encodes" ayarı yok)
+        self.encode_slots_spin = QSpinBox(); self.encode_slots_spin.setRange(0, 16); self.encode_slots_spin.setSpecialValueText("Auto")
+        self.encode_slots_spin.setValue(int(creator_core.get_processing_setting(self.settings, "encode_slots")))
+        self.encode_slots_spin.setToolTip("How many ffmpeg encodes run at once, across videos and languages.\n"
+                                          "Auto sizes it from the idle CPU cores (2 for GPU encoders).")
+        layout.addRow("Parallel Encodes (slots):", self.encode_slots_spin)
+
+        download = creator_core.get_processing_setting(self.settings, "download")
+        self.fragments_spin = QSpinBox(); self.fragments_spin.setRange(1, 32); self.fragments_spin.setValue(download["concurrent_fragments"])
+        layout.addRow("Concurrent Fragments per Download:", self.fragments_spin)
+        self.aria2c_cb = QCheckBox("Use aria2c when it is installed"); self.aria2c_cb.setChecked(download["external_downloader"] == "auto")
+        layout.addRow(self.aria2c_cb)
+
+        self.source_cache_spin = QSpinBox(); self.source_cache_spin.setRange(0, 10000); self.source_cache_spin.setSuffix(" GB")
+        self.source_cache_spin.setValue(int(creator_core.get_processing_setting(self.settings, "source_cache_max_gb")))
+        self.source_cache_spin.setToolTip("Least recently used source downloads are deleted above this size (0 = unlimited).")
+        layout.addRow("Source Cache Limit:", self.source_cache_spin)
         
-        info_label = QLabel("Output is fixed to 2K (1440x2560) @ 60fps.")
+        # Çıktı kaynağa göre seçilir; burada sadece tavanlar gösterilir
+        ceilings = creator_core.get_processing_setting(self.settings, "output_profile")
+        if ceilings["enabled"]:
+            info_text = (f"Output follows the source (9:16, no upscaling) up to {ceilings['max_height'] * 9 // 16}x{ceilings['max_height']}"
+                         f" @ {ceilings['max_fps']}fps, {ceilings['min_bitrate_k']}-{ceilings['max_bitrate_k']} kbit/s.")
+        else:
+            info_text = "Output is fixed to 2K (1440x2560) @ 60fps."
+        info_label = QLabel(info_text); info_label.setWordWrap(True)
         layout.addRow(info_label)
         return widget
 
@@ -446,9 +488,20 @@ class SettingsDialog(QDialog):
         self.settings["links_file"] = self.links_file_edit.text()
         self.settings["used_links_file"] = self.used_links_file_edit.text()
         self.settings["output_dir"] = self.output_dir_edit.text()
+        self.settings["source_cache_dir"] = self.source_cache_dir_edit.text()
+        self.settings["source_cache_max_gb"] = self.source_cache_spin.value()
         self.settings["yt_dlp_quality"] = self.quality_combo.currentText()
         self.settings["ffmpeg_preset"] = self.preset_combo.currentText()
         self.settings["hardware_accel"] = self.hardware_combo.currentText()
+        workers = creator_core.get_processing_setting(self.settings, "pipeline_workers")
+        for stage, spin in self.stage_spins.items(): workers[stage] = spin.value()
+        self.settings["pipeline_workers"] = workers
+        self.settings["encode_slots"] = self.encode_slots_spin.value()
+        download = creator_core.get_processing_setting(self.settings, "download")
+        download["concurrent_fragments"] = self.fragments_spin.value()
+        if self.aria2c_cb.isChecked(): download["external_downloader"] = "auto"
+        elif download["external_downloader"] == "auto": download["external_downloader"] = ""
+        self.settings["download"] = download
         # CRF AYARI KALDIRILDI
         # self.settings["ffmpeg_crf"] = self.crf_spinbox.value() 
         return self.settings
@@ -497,6 +550,7 @@ class AutomationApp(QMainWindow):
         self.creator_worker = None
         self.uploader_worker = None
         self.active_uploaders = [] # Aktif yüklemeleri tutacak liste
+        self.link_queue = None # Kalıcı link kuyruğu (get_link_queue ile açılır)
         
         self.normal_geometry = self.geometry()
         self.start_drag_pos = None
@@ -526,6 +580,8 @@ class AutomationApp(QMainWindow):
         main_layout.addWidget(self.create_left_panel(), 1)
         main_layout.addWidget(self.create_right_panel(), 3)
         self.status_bar = QStatusBar(); self.setStatusBar(self.status_bar); self.status_bar.showMessage("Ready")
+        self.prefetch_label = QLabel(); self.status_bar.addPermanentWidget(self.prefetch_label)
+        self.encode_label = QLabel(); self.status_bar.addPermanentWidget(self.encode_label)
 
     def create_menu_bar(self):
         menu_bar = QMenuBar(self)
@@ -652,7 +708,8 @@ class AutomationApp(QMainWindow):
             return text.lower().replace(' ', '_').replace('.', '_')
 
         for group_title, widgets in [
-            ("Link Management", [("Add Link from Clipboard", 'fa5.clipboard', self.add_link_from_clipboard)]),
+            ("Link Management", [("Add Link from Clipboard", 'fa5.clipboard', self.add_link_from_clipboard),
+                                 ("Remove Duplicate Links", 'fa5s.filter', self.dedupe_links)]),
             ("File Operations", [
                 ("Open Output Folder", 'fa5s.folder-open', lambda: self.open_path(self.settings.get("output_dir"))),
                 ("Edit links.txt", 'fa5s.edit', lambda: self.open_path(self.settings.get("links_file"))),
@@ -708,10 +765,12 @@ class AutomationApp(QMainWindow):
         self.progress_bar.setValue(0); self.upload_button.setEnabled(False); self.last_processed_metadata = []
         spinner_icon = qta.icon('fa5s.spinner', color='white', animation=qta.Spin(self.start_button))
         self.start_button.setIcon(spinner_icon)
-        self.creator_worker = CreatorWorker(self.settings); self.creator_worker.log_message.connect(self.log)
+        self.creator_worker = CreatorWorker(self.settings, self.get_link_queue()); self.creator_worker.log_message.connect(self.log)
         self.creator_worker.progress.connect(self.progress_bar.setValue); self.creator_worker.finished.connect(self.on_creation_finished)
         self.creator_worker.remaining_links_count.connect(self.update_remaining_links_label)
         self.creator_worker.processed_stats.connect(self.update_processed_stats)
+        self.creator_worker.prefetch_status.connect(self.update_prefetch_status)
+        self.creator_worker.encode_status.connect(self.update_encode_status)
 
         
         self.creator_worker.video_finished.connect(self.on_single_video_finished)
@@ -856,6 +915,7 @@ class AutomationApp(QMainWindow):
         # Nokta (.) yerine alt çizgi (_) kullanıyoruz çünkü butonlar öyle kaydedildi.
         btn_names = [
             "add_link_from_clipboard", 
+            "remove_duplicate_links",
             "open_output_folder", 
             "edit_links_txt",          # DÜZELDİ: edit_links.txt -> edit_links_txt
             "edit_used_link_txt",      # YENİ: edit_used_link.txt -> edit_used_link_txt
@@ -870,12 +930,36 @@ class AutomationApp(QMainWindow):
 
     def log(self, msg): self.log_output.append(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}"); QApplication.processEvents()
     
+    def get_link_queue(self):
+        """
+        Opens (or reopens after a path change) the link queue that belongs to
+        the configured links file. While a run is active the running queue is
+        kept; a new links file takes effect when the run ends.
+        """
+        queue_path = creator_core.default_queue_path(self.settings.get("links_file"))
+        running = self.creator_worker is not None and self.creator_worker.isRunning()
+        if self.link_queue is not None and running:
+            # Çalışan işçi bu kuyruğu kullanıyor: kapatılırsa sıradaki claim/commit kapalı bağlantıya düşer
+            return self.link_queue
+        if self.link_queue is None or self.link_queue.db_path != queue_path:
+            if self.link_queue is not None: self.link_queue.close()
+            self.link_queue = creator_core.LinkQueue(queue_path)
+            self.link_queue.sync_uploaded_log(creator_core.UPLOADED_LOG_FILE)
+            self.link_queue.import_text_files(self.settings.get("links_file"), self.settings.get("used_links_file"))
+        return self.link_queue
+
     def update_remaining_links_label(self, count=None):
         try:
-            if count is None: count = creator_core.get_remaining_links_count(self.settings.get("links_file"), self.settings.get("used_links_file"))
+            if count is None: count = creator_core.get_remaining_links_count(self.settings.get("links_file"), self.settings.get("used_links_file"), self.get_link_queue())
             self.remaining_links_label.setText(f"Remaining Links: <b>{count}</b>")
         except Exception as e: self.log(f"Could not count links: {e}")
 
+    def update_prefetch_status(self, depth, bytes_in_flight):
+        self.prefetch_label.setText(f"Prefetch: {depth} | {bytes_in_flight / 1024 ** 2:.0f} MB" if depth else "")
+
+    def update_encode_status(self, queued, busy, slots):
+        self.encode_label.setText(f"Encode: {busy}/{slots} slots | {queued} queued" if busy or queued else "")
+
     def update_processed_stats(self, c, s): self.processed_videos_label.setText(f"Processed: <b>{c}</b>"); h, r = divmod(s, 3600); m, s = divmod(r, 60); self.total_time_label.setText(f"Time: <b>{h:02d}:{m:02d}:{s:02d}</b>")
     
     def setup_directories(self):
@@ -893,6 +977,7 @@ class AutomationApp(QMainWindow):
             "yt_dlp_quality": "1080p", "ffmpeg_preset": "fast"
             # ffmpeg_crf kaldırıldı
         }
+        defaults.update(creator_core.DEFAULT_PROCESSING_SETTINGS)
         if SETTINGS_FILE.exists():
             try:
                 with open(SETTINGS_FILE, 'r') as f: defaults.update(json.load(f))
@@ -930,6 +1015,9 @@ class AutomationApp(QMainWindow):
         if dialog.exec():
             self.settings = dialog.get_settings(); self.save_settings()
             self.log("✅ Settings saved."); self.update_remaining_links_label()
+            if (self.link_queue is not None and self.creator_worker and self.creator_worker.isRunning()
+                    and self.link_queue.db_path != creator_core.default_queue_path(self.settings.get("links_file"))):
+                self.log("ℹ️ The new links file is used after the current run finishes.")
     
 
     def open_auth_checker(self):
@@ -958,13 +1046,27 @@ class AutomationApp(QMainWindow):
 
     def add_link_from_clipboard(self):
         try:
-            with open(self.settings.get("links_file"), 'a') as f: f.write(QApplication.clipboard().text().strip() + '\n')
-            self.log("✅ Link added."); self.update_remaining_links_label()
+            link = QApplication.clipboard().text().strip()
+            if not link: self.log("⚠️ Clipboard is empty."); return
+            if self.get_link_queue().add_link(link, self.settings.get("links_file")): self.log("✅ Link added.")
+            else: self.log("ℹ️ Link is already in the queue.")
+            self.update_remaining_links_label()
         except Exception as e: QMessageBox.critical(self, "File Error", f"Could not write to links file: {e}")
     
+    def dedupe_links(self):
+        try:
+            queue = self.get_link_queue()
+            queue.sync_uploaded_log(creator_core.UPLOADED_LOG_FILE)
+            duplicates, already_uploaded = queue.dedupe_links_file(self.settings.get("links_file"))
+            self.log(f"🧹 Removed {duplicates} duplicate and {already_uploaded} already uploaded link(s) from links.txt.")
+            self.update_remaining_links_label()
+        except Exception as e: QMessageBox.critical(self, "File Error", f"Could not rewrite links file: {e}")
+
     def clear_used_links(self):
         if QMessageBox.question(self, "Confirm", "Clear used links log?") == QMessageBox.StandardButton.Yes:
-            try: Path(self.settings.get("used_links_file")).write_text(''); self.log("✅ Used links log cleared."); self.update_remaining_links_label()
+            try:
+                Path(self.settings.get("used_links_file")).write_text(''); self.get_link_queue().reset_completed()
+                self.log("✅ Used links log cleared."); self.update_remaining_links_label()
             except Exception as e: QMessageBox.critical(self, "File Error", f"Could not clear file: {e}")
     
     def clear_output(self):
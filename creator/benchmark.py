@@ -0,0 +1,187 @@
+# Automation/creator/benchmark.py
+# Small benchmarks for the creator pipeline.
+# Usage (from the project root):
+#   python -m creator.benchmark layout
+#   python -m creator.benchmark overlay [--input clip.mp4]
+#   python -m creator.benchmark encoders [--profiles libx264:crf,libx265:capped_crf] [--seconds 5]
+
+import argparse
+import os
+import re
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from PIL import ImageFont
+
+from creator import encoders, layout, overlay
+from creator.output_profile import DEFAULT_PROFILE
+
+SAMPLE_CAPTIONS = [
+    "You're not good enough. Prove me wrong.",
+    "Du bist nicht gut genug. Beweise mir das Gegenteil.",
+    "Tu n'es pas assez bon. Prouve-moi le contraire.",
+    "No eres lo suficientemente bueno. Demuéstrame que me equivoco.",
+    "Ты недостаточно хорош. Докажи, что я не прав.",
+    "Non sei abbastanza bravo. Dimostrami che mi sbaglio.",
+    "Yeterince iyi değilsin. Yanıldığımı kanıtla.",
+]
+
+
+def _legacy_fit(text, frame_width=1440, frame_height=2560):
+    # Eski add_text_overlay_to_video döngüsü (karşılaştırma için)
+    max_font_size = int(frame_height / 25)
+    min_font_size = int(frame_height / 50)
+    max_text_width = int(frame_width * 0.9)
+    font_size = max_font_size
+    while font_size >= min_font_size:
+        pil_font = ImageFont.truetype(str(layout.DEFAULT_FONT_PATH), font_size)
+        avg_char_width = pil_font.getlength("x")
+        max_chars_per_line = int(max_text_width / avg_char_width) if avg_char_width > 0 else 20
+        wrapper = re.compile(f'.{{1,{max_chars_per_line}}}(?=\\s|$)')
+        lines = wrapper.findall(text)
+        text_w = max(pil_font.getlength(line) for line in lines) if lines else 0
+        if text_w <= max_text_width:
+            break
+        font_size -= 2
+    return font_size
+
+def _timed(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+def bench_layout(args):
+    captions = SAMPLE_CAPTIONS * args.videos
+
+    legacy_ms = _timed(lambda: [_legacy_fit(c) for c in captions], args.rounds)
+
+    def cold():
+        layout.clear_caches()
+        for c in captions: layout.fit_caption(c, 1440, 2560)
+    cold_ms = _timed(cold, args.rounds)
+
+    warm_ms = _timed(lambda: [layout.fit_caption(c, 1440, 2560) for c in captions], args.rounds)
+
+    print(f"Layout of {len(captions)} captions ({args.videos} videos x {len(SAMPLE_CAPTIONS)} languages):")
+    print(f"  legacy loop : {legacy_ms:9.2f} ms")
+    print(f"  cached cold : {cold_ms:9.2f} ms")
+    print(f"  cached warm : {warm_ms:9.2f} ms")
+    print(f"  {layout.cache_info()}")
+
+
+def _overlay_graph(renderer, caption, width, height, workdir):
+    # Aynı yazı için drawtext ve PNG overlay filtre zincirleri
+    extra_inputs = []
+    if renderer == "png":
+        image_path, _ = overlay.render_caption_image(caption, width, height, cache_dir=workdir)
+        extra_inputs = ['-i', str(image_path)]
+        graph = f"[0:v]scale={width}:{height},setsar=1[s0];" + overlay.overlay_filter("s0", "1:v", "v0")
+    else:
+        # core.build_drawtext_filter ile aynı yardımcı
+        drawtext, _ = overlay.drawtext_filter(caption, width, height, cache_dir=workdir)
+        graph = f"[0:v]scale={width}:{height},setsar=1,{drawtext}[v0]"
+    return extra_inputs, graph
+
+def bench_overlay(args):
+    if args.input:
+        source = ['-i', args.input]
+    else:
+        source = ['-f', 'lavfi', '-i', f"testsrc2=size=2160x3840:rate=60:duration={args.seconds}"]
+    frames = args.seconds * 60
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for renderer in ("drawtext", "png"):
+            extra_inputs, graph = _overlay_graph(renderer, args.caption, 1440, 2560, workdir)
+            cmd = (['ffmpeg', '-y', '-v', 'error'] + source + extra_inputs +
+                   ['-t', str(args.seconds), '-filter_complex', graph, '-map', '[v0]', '-r', '60',
+                    '-c:v', 'libx264', '-preset', args.preset, '-f', 'null', '-'])
+            start = time.perf_counter()
+            subprocess.run(cmd, check=True)
+            elapsed = time.perf_counter() - start
+            print(f"  {renderer:8s}: {elapsed:7.2f} s  ~{frames / elapsed:6.1f} fps")
+
+
+def _encoder_profiles(args):
+    # "encoder:mod" listesi; verilmezse bu ffmpeg'de bulunan her encoder'ın desteklediği her mod
+    if args.profiles:
+        return [tuple(item.split(":", 1)) if ":" in item else (item, "crf") for item in args.profiles.split(",")]
+    return [(spec.name, mode) for spec in encoders.registered_encoders() for mode in encoders.RATE_MODES if spec.supports(mode)]
+
+def bench_encoders(args):
+    width, height = (int(v) for v in args.size.split("x"))
+    profile = DEFAULT_PROFILE._replace(width=width, height=height, fps=float(args.fps), rate=str(args.fps))
+    source = ['-f', 'lavfi', '-i', f"testsrc=size={width}x{height}:rate={args.fps}:duration={args.seconds}"]
+    frames = args.seconds * args.fps
+    results = encoders.load_calibration(args.output)
+
+    print(f"Encoder calibration: {args.seconds}s testsrc {args.size}@{args.fps}, preset {args.preset}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, mode in _encoder_profiles(args):
+            spec = encoders.ENCODERS.get(name)
+            if spec is None or not spec.supports(mode):
+                print(f"  {name:11s} {mode:10s}: not supported")
+                continue
+            output = Path(workdir) / f"{name}_{mode}.mp4"
+            base = ['ffmpeg', '-y', '-v', 'error'] + source + ['-c:v', name, '-preset', spec.preset_for(args.preset)]
+            rate = spec.rate_args(profile, mode, args.crf) + spec.extra_args + ['-pix_fmt', 'yuv420p']
+            passlog = ['-passlogfile', str(Path(workdir) / f"{name}.2pass")]
+            if mode == "2pass":
+                commands = [base + rate + ['-pass', '1'] + passlog + ['-f', 'null', os.devnull],
+                            base + rate + ['-pass', '2'] + passlog + [str(output)]]
+            else:
+                commands = [base + rate + [str(output)]]
+            start = time.perf_counter()
+            try:
+                for cmd in commands:
+                    subprocess.run(cmd, check=True, capture_output=True, text=True)
+            except subprocess.CalledProcessError as e:
+                error = (e.stderr or "").strip().splitlines()
+                print(f"  {name:11s} {mode:10s}: failed ({error[-1] if error else e.returncode})")
+                results[f"{name}:{mode}"] = {"error": error[-1] if error else str(e.returncode), "time": time.time()}
+                continue
+            elapsed = time.perf_counter() - start
+            size = output.stat().st_size
+            kbps = size * 8 / args.seconds / 1000
+            print(f"  {name:11s} {mode:10s}: {frames / elapsed:7.1f} fps  {size / 1024 ** 2:7.2f} MB  {kbps:8.0f} kbit/s")
+            results[f"{name}:{mode}"] = {"fps": round(frames / elapsed, 2), "bytes": size, "kbps": round(kbps),
+                                         "size": args.size, "rate": args.fps, "preset": args.preset,
+                                         "crf": spec.default_crf if args.crf is None else args.crf, "time": time.time()}
+
+    encoders.save_calibration(results, args.output)
+    print(f"  saved to {args.output}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Creator pipeline benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_layout = sub.add_parser("layout", help="Overlay font fitting: legacy loop vs cached layout engine")
+    p_layout.add_argument("--videos", type=int, default=10)
+    p_layout.add_argument("--rounds", type=int, default=3)
+    p_layout.set_defaults(func=bench_layout)
+
+    p_overlay = sub.add_parser("overlay", help="Encode fps: drawtext vs pre-rendered PNG overlay")
+    p_overlay.add_argument("--input", help="Source clip (default: synthetic 4K testsrc2)")
+    p_overlay.add_argument("--seconds", type=int, default=10)
+    p_overlay.add_argument("--preset", default="veryfast")
+    p_overlay.add_argument("--caption", default=SAMPLE_CAPTIONS[0])
+    p_overlay.set_defaults(func=bench_overlay)
+
+    p_encoders = sub.add_parser("encoders", help="Calibrate encoder/rate-control profiles: fps and output size on testsrc")
+    p_encoders.add_argument("--profiles", help="Comma-separated encoder:mode list (default: every available combination)")
+    p_encoders.add_argument("--seconds", type=int, default=5)
+    p_encoders.add_argument("--size", default=f"{DEFAULT_PROFILE.width}x{DEFAULT_PROFILE.height}")
+    p_encoders.add_argument("--fps", type=int, default=int(DEFAULT_PROFILE.fps))
+    p_encoders.add_argument("--preset", default="medium")
+    p_encoders.add_argument("--crf", type=int, help="CRF/CQ value (default: each encoder's own)")
+    p_encoders.add_argument("--output", default=str(encoders.CALIBRATION_PATH))
+    p_encoders.set_defaults(func=bench_encoders)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Automation/creator/cache_store.py
+# Persistent key/value cache on SQLite with TTL and size-based (LRU) eviction.
+# Several caches share one database file, separated by namespace.
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+CACHE_DIR = Path(__file__).parent / "cache"
+DEFAULT_DB_PATH = CACHE_DIR / "creator_cache.sqlite"
+
+
+def make_key(*parts):
+    """Stable content hash of any JSON-serializable parts."""
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PersistentCache:
+    def __init__(self, namespace, db_path=DEFAULT_DB_PATH, ttl_seconds=None, max_bytes=None):
+        self.namespace = namespace
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " size INTEGER NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (namespace, accessed)")
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM cache_entries WHERE namespace=? AND key=?", (self.namespace, key)
+            ).fetchone()
+            if row and self.ttl_seconds and now - row[1] > self.ttl_seconds:
+                with self._conn:
+                    self._conn.execute("DELETE FROM cache_entries WHERE namespace=? AND key=?", (self.namespace, key))
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            with self._conn:
+                self._conn.execute("UPDATE cache_entries SET accessed=? WHERE namespace=? AND key=?", (now, self.namespace, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        data = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, data, len(data.encode("utf-8")), now, now),
+            )
+            self._evict()
+
+    def _evict(self):
+        # Süresi dolanları sil, sonra boyut sınırı aşılıyorsa en eski erişilenlerden başlayarak sil
+        if self.ttl_seconds:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace=? AND created < ?",
+                               (self.namespace, time.time() - self.ttl_seconds))
+        if not self.max_bytes:
+            return
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace=?",
+                                   (self.namespace,)).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM cache_entries WHERE namespace=? ORDER BY accessed",
+                                  (self.namespace,)).fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self.max_bytes: break
+            doomed.append((self.namespace, key)); total -= size
+        self._conn.executemany("DELETE FROM cache_entries WHERE namespace=? AND key=?", doomed)
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace=?", (self.namespace,))
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries WHERE namespace=?", (self.namespace,)
+            ).fetchone()
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": (self.hits / lookups) if lookups else 0.0,
+                "entries": entries, "bytes": size}
+
+    def stats_line(self):
+        st = self.stats()
+        return (f"{self.namespace} cache: {st['hits']}/{st['hits'] + st['misses']} hits ({st['hit_rate']:.0%}), "
+                f"{st['entries']} entries, {st['bytes'] / 1024:.0f} KB")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
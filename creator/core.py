@@ -3,25 +3,41 @@
 # --- FULLY CORRECTED VERSION FOR 2K 60FPS OUTPUT & GPU SUPPORT ---
 
 import os
-import re
 import json
 import time
+import hashlib
+import shutil
 import traceback
-import subprocess
 import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 import sys
 
 import yt_dlp
 from openai import OpenAI
-from deep_translator import GoogleTranslator
-from PIL import Image, ImageDraw, ImageFont
-from langdetect import detect, LangDetectException
+from langdetect import detect, LangDetectException, DetectorFactory
 from PyQt6.QtCore import QObject, pyqtSignal
 
+from creator import overlay
+from creator.cache_store import PersistentCache, make_key
+from creator.download_progress import DownloadProgress, run_watched
+from creator.ffmpeg_progress import EncodeProgress, FFmpegError, run_with_progress
+from creator.link_queue import LinkQueue, default_queue_path, get_video_id
+from creator.manifest import VideoManifest, mark_uploaded
+from creator.pipeline import Stage, StagePipeline
+from creator.prefetch import Prefetcher
+from creator.encode_farm import EncodeFarm, cpu_utilization, outputs_per_command, plan_slots
+from creator.segment_encode import encode_segmented
+from creator.encoders import ENCODERS, get_encoder
+from creator.output_profile import DEFAULT_PROFILE, DEFAULT_CEILINGS as OUTPUT_PROFILE_CEILINGS, choose_profile, describe as describe_profile, matches_profile, probe_source
+from creator.preflight import Preflight, DEFAULT_RULES as PREFLIGHT_RULES, REJECT, DEFER
+from creator.source_cache import SourceCache
+from creator.translation import Translator
+
 # --- Configuration ---
 CREATOR_DIR = Path(__file__).parent
 FONT_PATH = CREATOR_DIR / "Oswald-Regular.ttf"
+UPLOADED_LOG_FILE = CREATOR_DIR.parent / "uploader" / "uploaded_videos.log"
 
 # Supported languages
 SUPPORTED_LANGUAGES = {
@@ -30,6 +46,7 @@ SUPPORTED_LANGUAGES = {
 }
 LANG_CODE_MAP = {k: k for k in SUPPORTED_LANGUAGES}
 ENABLED_LANGUAGES = list(SUPPORTED_LANGUAGES.keys())
+DetectorFactory.seed = 0  # langdetect'i deterministik yap (çeviri önbellek anahtarı kaynak dile bağlı)
 
 
 # --- PyQt Signals for GUI Communication ---
@@ -39,6 +56,8 @@ class WorkerSignals(QObject):
     remaining_links_count = pyqtSignal(int)
     processed_stats = pyqtSignal(int, int)
     video_finished = pyqtSignal(list)  
+    prefetch_status = pyqtSignal(int, float)  # önden indirilen video sayısı, diskteki bayt
+    encode_status = pyqtSignal(int, int, int)  # slot bekleyen encode, dolu slot, toplam slot
 
 
 # --- File I/O Helper Functions ---
@@ -54,184 +73,457 @@ def write_lines_to_file(filepath, lines):
 def append_line_to_file(filepath, line):
     with open(filepath, 'a', encoding='utf-8') as f: f.write(line + '\n')
 
-def get_remaining_links_count(links_file_path, used_links_file_path):
+def get_remaining_links_count(links_file_path, used_links_file_path, link_queue=None):
+    if link_queue is not None:
+        link_queue.sync_links_file(links_file_path)
+        return link_queue.remaining_count()
     all_links = set(read_lines_from_file(links_file_path))
     used_links = set(read_lines_from_file(used_links_file_path))
     return len(all_links - used_links)
 
 
 # --- Video Processing Core Functions ---
-def get_video_id(youtube_url):
-    match = re.search(r"(?:v=|\/|be\/)([a-zA-Z0-9_-]{11})(?:&|\?|$)", youtube_url)
-    return match.group(1) if match else None
+QUALITY_HEIGHTS = {
+    "4K (2160p)": "2160", "2K (1440p)": "1440",
+    "1080p": "1080", "720p": "720"
+}
+
+def build_format_string(quality):
+    height_constraint = QUALITY_HEIGHTS.get(quality, "1080")
+    return f'bestvideo[height<={height_constraint}]+bestaudio/best[height<={height_constraint}]'
+
+def build_format_options(quality, prefer_cheap=True):
+    """
+    yt-dlp format options. With prefer_cheap, formats are ranked instead of
+    filtered: resolution up to min(quality, output width) first (yt-dlp's
+    'res' is the smaller side, so vertical 1440x2560 counts as 1440p), then
+    H.264 over VP9/AV1 and AAC audio, which are cheap to decode or can be
+    stream-copied.
+    """
+    if not prefer_cheap:
+        return {'format': build_format_string(quality)}
+    resolution = min(int(QUALITY_HEIGHTS.get(quality, "1080")), OUTPUT_WIDTH)
+    return {'format': 'bv*+ba/b', 'format_sort': [f'res:{resolution}', 'vcodec:h264', f'fps:{OUTPUT_FPS}', 'acodec:aac']}
+
+def build_download_options(download_settings=None):
+    """yt-dlp network options (fragments, external downloader, chunking, timeouts, retries) from the 'download' setting."""
+    cfg = {**DEFAULT_PROCESSING_SETTINGS["download"], **(download_settings or {})}
+    opts = {
+        'concurrent_fragment_downloads': max(1, int(cfg["concurrent_fragments"])),
+        'socket_timeout': cfg["socket_timeout"],
+        'retries': cfg["retries"],
+        'fragment_retries': cfg["fragment_retries"],
+    }
+    if cfg["http_chunk_size_mb"]:
+        # Büyük tek parça indirmeleri parçalara böl (YouTube tek bağlantıyı yavaşlatır)
+        opts['http_chunk_size'] = int(cfg["http_chunk_size_mb"] * 1024 * 1024)
+    downloader = cfg["external_downloader"]
+    if downloader == "auto":
+        downloader = "aria2c" if shutil.which("aria2c") else ""
+    if downloader:
+        opts['external_downloader'] = {'default': downloader}
+        if cfg["external_downloader_args"]:
+            opts['external_downloader_args'] = {downloader: list(cfg["external_downloader_args"])}
+    return opts
 
-def download_video_and_metadata(youtube_url, output_base_dir, quality, signals: WorkerSignals):
+def describe_download_options(opts):
+    downloader = (opts.get('external_downloader') or {}).get('default', 'native')
+    return f"{downloader}, {opts['concurrent_fragment_downloads']} fragment(s)"
+
+def download_video_and_metadata(youtube_url, output_base_dir, quality, signals: WorkerSignals, source_cache=None,
+                                preflight_info=None, stop_event=None, download_settings=None, prefer_cheap_formats=True):
+    """
+    Downloads the source (or reuses a cached one). preflight_info is an info
+    dict from extract_info(download=False); when given, yt-dlp downloads from
+    it without extracting the page again. Setting stop_event aborts the
+    download at the next progress update.
+    """
     video_id = get_video_id(youtube_url)
     if not video_id:
         signals.log_message.emit(f"❌ Invalid YouTube URL: {youtube_url}")
         return None
 
-    video_output_dir = output_base_dir / video_id
+    height_constraint = QUALITY_HEIGHTS.get(quality, "1080")
+    # Önceki denemeden kalan tam bir kaynak varsa ağa hiç çıkmadan onu kullan
+    source_cache = source_cache or SourceCache(output_base_dir)
+    cached_info = source_cache.lookup(video_id, int(height_constraint))
+    if cached_info:
+        signals.log_message.emit(f"♻️ Reusing cached source: {Path(cached_info['downloaded_filepath']).name}")
+        return cached_info
+
+    video_output_dir = source_cache.entry_dir(video_id)
     video_output_dir.mkdir(parents=True, exist_ok=True)
     output_template = video_output_dir / '%(id)s.%(ext)s'
-    
-    quality_map = {
-        "4K (2160p)": "2160", "2K (1440p)": "1440",
-        "1080p": "1080", "720p": "720"
-    }
-    height_constraint = quality_map.get(quality, "1080")
-    format_string = f'bestvideo[height<={height_constraint}]+bestaudio/best[height<={height_constraint}]'
 
+    download_cfg = {**DEFAULT_PROCESSING_SETTINGS["download"], **(download_settings or {})}
     ydl_opts = {
-        'outtmpl': str(output_template), 'format': format_string, 'merge_output_format': 'mp4',
+        'outtmpl': str(output_template), 'merge_output_format': 'mp4',
         'writedescription': True, 'writeinfojson': True, 'quiet': True, 'no_warnings': True,
-        'progress_hooks': [lambda d: signals.progress.emit(20) if d['status'] == 'finished' else None],
+        **build_format_options(quality, prefer_cheap_formats),
+        **build_download_options(download_cfg),
     }
 
-    try:
-        signals.log_message.emit(f"⏳ Downloading video ({quality}) for: {youtube_url}")
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info_dict = ydl.extract_info(youtube_url, download=True)
-        downloaded_filepath = Path(ydl.prepare_filename(info_dict))
-        info_dict['downloaded_filepath'] = str(downloaded_filepath)
-        signals.log_message.emit(f"✅ Download complete: {info_dict.get('title', 'Untitled Video')}")
-        return info_dict
-    except Exception as e:
-        signals.log_message.emit(f"❌ Error during download: {e}\n{traceback.format_exc()}")
-        return None
+    signals.log_message.emit(f"⏳ Downloading video ({quality}, {describe_download_options(ydl_opts)}) for: {youtube_url}")
+    started = time.perf_counter()
+    for attempt in range(download_cfg["stall_retries"] + 1):
+        progress = DownloadProgress(signals, 10, 30, stop_event, download_cfg["stall_timeout"],
+                                    download_cfg["progress_interval"], download_cfg["progress_log_interval"],
+                                    watch_dir=video_output_dir)
+        attempt_opts = {**ydl_opts, 'progress_hooks': [progress.hook], 'postprocessor_hooks': [progress.postprocessor_hook],
+                        'retry_sleep_functions': {'http': progress.retry_sleep, 'fragment': progress.retry_sleep}}
+
+        def run_attempt(attempt=attempt, attempt_opts=attempt_opts):
+            with yt_dlp.YoutubeDL(attempt_opts) as ydl:
+                if preflight_info and attempt == 0:
+                    return ydl, ydl.process_ie_result(preflight_info, download=True)
+                # Takılan indirmede format URL'leri yeniden alınır; .part dosyaları kaldığı yerden devam eder
+                return ydl, ydl.extract_info(youtube_url, download=True)
+        try:
+            # Hiç veri gelmeyen bağlantıda kanca çağrılmaz: watchdog stall_timeout sonunda denemeyi bırakır
+            ydl, info_dict = run_watched(run_attempt, progress, grace=download_cfg["socket_timeout"] + 5)
+            break
+        except Exception as e:
+            if progress.cancelled:
+                signals.log_message.emit(f"🛑 Download cancelled: {youtube_url}")
+                return None
+            if progress.stalled and attempt < download_cfg["stall_retries"]:
+                signals.log_message.emit(f"⚠️ Download stalled ({download_cfg['stall_timeout']}s without data); "
+                                         f"retrying ({attempt + 1}/{download_cfg['stall_retries']})...")
+                continue
+            signals.log_message.emit(f"❌ Error during download: {e}\n{traceback.format_exc()}")
+            return None
 
-def add_text_overlay_to_video(input_path, output_path, text, ffmpeg_preset, signals: WorkerSignals, enable_text=True, hardware_accel="CPU"):
-    signals.log_message.emit(f"⏳ Processing (2K/60fps) | Text: {'ON' if enable_text else 'OFF'} | Encoder: {hardware_accel}")
+    downloaded_filepath = Path(ydl.prepare_filename(info_dict))
+    info_dict['downloaded_filepath'] = str(downloaded_filepath)
+    source_cache.record(video_id, downloaded_filepath, int(height_constraint))
+    elapsed = time.perf_counter() - started
+    size = downloaded_filepath.stat().st_size if downloaded_filepath.exists() else 0
+    info_dict['download_stats'] = {"bytes": size, "seconds": elapsed, "options": describe_download_options(ydl_opts)}
+    signals.log_message.emit(f"✅ Download complete: {info_dict.get('title', 'Untitled Video')} "
+                             f"({size / 1024 ** 2:.1f} MB in {elapsed:.1f}s, {size / 1024 ** 2 / max(elapsed, 1e-6):.2f} MB/s)")
+    return info_dict
 
-    try:
-        # 1. Encoder ve Preset Ayarlaması (Tercüman Kısmı)
-        video_codec = 'libx264' # Varsayılan CPU
-        final_preset = ffmpeg_preset # Varsayılan olarak arayüzden geleni kullan
-
-        if hardware_accel == "NVIDIA (NVENC)":
-            video_codec = 'h264_nvenc'
-            # NVIDIA 'veryslow' anlamaz, onu P1-P7 arasına çevirmemiz lazım
-            # P1: En Hızlı, P7: En Kaliteli
-            if ffmpeg_preset in ["ultrafast", "superfast"]:
-                final_preset = "p1"
-            elif ffmpeg_preset in ["veryfast", "faster"]:
-                final_preset = "p3"
-            elif ffmpeg_preset in ["fast", "medium"]:
-                final_preset = "p5"
-            else: # slow, slower, veryslow
-                final_preset = "p7" # En yüksek kaliteye sabitle
-                
-        elif hardware_accel == "AMD (AMF)":
-            video_codec = 'h264_amf'
-            # AMD için basit çeviri
-            if "fast" in ffmpeg_preset: final_preset = "speed"
-            elif "slow" in ffmpeg_preset: final_preset = "quality"
-            else: final_preset = "balanced"
-        
-        # 2. Filtreler: 2K ölçekleme ve kare piksel
-        vf_options = [f"scale=1440:2560", f"setsar=1"]
-
-        # 3. Yazı Ekleme (İsteniyorsa)
-        if enable_text:
-            max_font_size = int(2560 / 25)
-            min_font_size = int(2560 / 50)
-            max_text_width = int(1440 * 0.9)
-
-            font_size = max_font_size
-            wrapped_text = text
-            while font_size >= min_font_size:
-                pil_font = ImageFont.truetype(str(FONT_PATH), font_size)
-                avg_char_width = pil_font.getlength("x")
-                max_chars_per_line = int(max_text_width / avg_char_width) if avg_char_width > 0 else 20
-                wrapper = re.compile(f'.{{1,{max_chars_per_line}}}(?=\\s|$)')
-                lines = wrapper.findall(text)
-                wrapped_text = "\n".join(lines)
-                text_w = max(pil_font.getlength(line) for line in lines) if lines else 0
-                if text_w <= max_text_width:
-                    break
-                font_size -= 2
-            else:
-                signals.log_message.emit("⚠️ Text may overflow even at minimum font size.")
-            
-            escaped_font_path = str(FONT_PATH.resolve()).replace('\\', '/').replace(':', '\\:')
-            vf_options.append(f"drawtext=fontfile='{escaped_font_path}':text='{wrapped_text}':fontcolor=white:fontsize={font_size}:x=(w-text_w)/2:y=(h-text_h)/2:box=1:boxcolor=black@0.5:boxborderw=15")
-
-        # 4. FFmpeg Komutunu Oluştur
-        ffmpeg_cmd = [
-            'ffmpeg', '-y', '-i', str(input_path),
-            '-vf', ",".join(vf_options),
-            '-r', '60',
-            '-c:v', video_codec,
-            '-preset', final_preset, # Artık çevrilmiş doğru preset kullanılıyor
-            '-b:v', '15000k',
-            '-maxrate', '20000k',
-            '-bufsize', '30000k',
-            '-pix_fmt', 'yuv420p',
-            '-c:a', 'aac', '-b:a', '192k',
-            str(output_path)
-        ]
-
-        subprocess.run(ffmpeg_cmd, check=True, capture_output=True, text=True)
-        signals.log_message.emit(f"✅ Video processing complete: {output_path.name}")
-        return True
+# --- Encoding Helpers ---
+# Tavan profil (kaynak bilinmiyorsa kullanılır); gerçek profil output_profile.choose_profile ile seçilir
+OUTPUT_WIDTH, OUTPUT_HEIGHT, OUTPUT_FPS = DEFAULT_PROFILE.width, DEFAULT_PROFILE.height, int(DEFAULT_PROFILE.fps)
+
+def resolve_encoder(ffmpeg_preset, hardware_accel="CPU", encoder="auto"):
+    # Encoder ve Preset Ayarlaması (Tercüman Kısmı): arayüzdeki x264 preset adı encoder'ın kendi preset'ine çevrilir
+    spec, _ = get_encoder(encoder, hardware_accel)
+    return spec.name, spec.preset_for(ffmpeg_preset)
 
+def build_base_filters(profile=DEFAULT_PROFILE):
+    # Profil çözünürlüğüne ölçekleme ve kare piksel
+    return [f"scale={profile.width}:{profile.height}", "setsar=1"]
+
+def build_drawtext_filter(text, signals: WorkerSignals, profile=DEFAULT_PROFILE):
+    # Yazı dosyadan okunur (textfile): tırnak, ':' ve '%' filtre zincirini bozmaz
+    drawtext, caption = overlay.drawtext_filter(text, profile.width, profile.height, FONT_PATH)
+    if not caption.fits:
+        signals.log_message.emit("⚠️ Text may overflow even at minimum font size.")
+    return drawtext
+
+def build_output_args(video_codec, final_preset, threads=0, profile=DEFAULT_PROFILE, pass_args=()):
+    # threads: encode slot başına ayrılan çekirdek sayısı (0 = ffmpeg karar verir)
+    thread_args = ['-threads', str(threads)] if threads else []
+    spec = ENCODERS.get(video_codec, ENCODERS["libx264"])
+    return thread_args + [
+        '-r', profile.rate,
+        '-c:v', video_codec,
+        '-preset', final_preset,
+    ] + spec.rate_args(profile, profile.rate_control, profile.crf) + list(pass_args) + spec.extra_args + [
+        '-pix_fmt', 'yuv420p',
+        '-c:a', 'aac', '-b:a', '192k',
+    ]
+
+def run_ffmpeg(ffmpeg_cmd, signals: WorkerSignals, success_message, duration=None, stats=None, progress_range=None, farm=None):
+    """
+    Runs ffmpeg while streaming its -progress output to the GUI. If a stats
+    dict is given it gets the frames, wall time and average fps of the run.
+    A farm (EncodeFarm) tracks the process so Stop can terminate it.
+    """
+    bar_start, bar_end = progress_range or (0, 0)
+    progress = EncodeProgress(signals, duration, bar_start, bar_end)
+    try:
+        result = run_with_progress(ffmpeg_cmd, progress, registry=farm)
     except FileNotFoundError:
         signals.log_message.emit("❌ FFmpeg/FFprobe not found. Check installation and system's PATH.")
         return False
-    except subprocess.CalledProcessError as e:
-        signals.log_message.emit(f"❌ FFmpeg error: {e.stderr}")
+    except FFmpegError as e:
+        if farm is not None and farm.stopped:
+            signals.log_message.emit("🛑 Encode cancelled.")
+            return False
+        signals.log_message.emit(f"❌ FFmpeg error (exit {e.returncode}):\n{e.stderr_tail}")
+        return False
+    if stats is not None:
+        stats.update(result)
+    signals.log_message.emit(f"{success_message} ({result['fps']:.1f} fps avg, {result['seconds']:.0f}s)")
+    return True
+
+def source_matches_output(video_info, probe=None, profile=DEFAULT_PROFILE):
+    """
+    True if the downloaded source is already H.264 at the profile's size and
+    frame rate (no re-encode needed). Uses the ffprobe result when there is
+    one, otherwise yt-dlp's info dict.
+    """
+    if probe:
+        return matches_profile(probe, profile)
+    if not video_info:
         return False
+    vcodec = video_info.get('vcodec') or ''
+    fps = video_info.get('fps') or 0
+    return (vcodec.startswith(('avc1', 'h264')) and video_info.get('width') == profile.width
+            and video_info.get('height') == profile.height and abs(fps - profile.fps) < 0.5)
+
+def source_audio_is_aac(video_info, probe=None):
+    if probe:
+        return probe.get("acodec") == "aac"
+    return ((video_info or {}).get('acodec') or '').startswith('mp4a')
+
+def remux_video(input_path, output_path, copy_audio, signals: WorkerSignals, profile=DEFAULT_PROFILE):
+    """Copies the video stream into a new mp4 (audio too if copy_audio, i.e. it is already AAC)."""
+    signals.log_message.emit(f"⚡ Source already matches {profile.width}x{profile.height}@{profile.fps:g} H.264; remuxing without re-encode.")
+    audio_args = ['-c:a', 'copy'] if copy_audio else ['-c:a', 'aac', '-b:a', '192k']
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    ffmpeg_cmd = (['ffmpeg', '-y', '-i', str(input_path), '-map', '0:v:0', '-map', '0:a?', '-c:v', 'copy']
+                  + audio_args + ['-movflags', '+faststart', str(output_path)])
+    return run_ffmpeg(ffmpeg_cmd, signals, f"✅ Remux complete: {Path(output_path).name}")
+
+def passlog_prefix(output_path):
+    return str(Path(output_path).with_suffix("")) + ".2pass"
+
+def build_encode_command(input_path, outputs, video_codec, final_preset, signals: WorkerSignals, enable_text=True, overlay_renderer="png", threads=0,
+                         profile=DEFAULT_PROFILE, pass_number=0):
+    """
+    ffmpeg command that decodes and scales input_path once and writes one file
+    per (output_path, text) pair. The caption is drawn with drawtext or
+    composited as a pre-rendered PNG, depending on overlay_renderer.
+    """
+    ffmpeg_cmd = ['ffmpeg', '-y', '-i', str(input_path)]
+    base = ",".join(build_base_filters(profile))
+    if len(outputs) == 1:
+        graph = [f"[0:v]{base}[s0]"]
+    else:
+        split_labels = "".join(f"[s{i}]" for i in range(len(outputs)))
+        graph = [f"[0:v]{base},split={len(outputs)}{split_labels}"]
+
+    for i, (_, text) in enumerate(outputs):
+        if not enable_text:
+            graph.append(f"[s{i}]null[v{i}]")
+        elif overlay_renderer == "png":
+            image_path, caption = overlay.render_caption_image(text, profile.width, profile.height, FONT_PATH)
+            if not caption.fits:
+                signals.log_message.emit("⚠️ Text may overflow even at minimum font size.")
+            input_index = ffmpeg_cmd.count('-i')
+            ffmpeg_cmd += ['-i', str(image_path)]
+            graph.append(overlay.overlay_filter(f"s{i}", f"{input_index}:v", f"v{i}"))
+        else:
+            graph.append(f"[s{i}]{build_drawtext_filter(text, signals, profile)}[v{i}]")
+
+    ffmpeg_cmd += ['-filter_complex', ";".join(graph)]
+    for i, (output_path, _) in enumerate(outputs):
+        # 2-pass: her çıktının kendi istatistik dosyası; 1. geçişte çıktı yazılmaz
+        pass_args = ['-pass', str(pass_number), '-passlogfile', passlog_prefix(output_path)] if pass_number else []
+        output_args = build_output_args(video_codec, final_preset, threads, profile, pass_args)
+        target = ['-an', '-f', 'null', os.devnull] if pass_number == 1 else [str(output_path)]
+        ffmpeg_cmd += ['-map', f'[v{i}]', '-map', '0:a?'] + output_args + target
+    return ffmpeg_cmd
+
+def encode_in_segments(input_path, output_path, text, ffmpeg_preset, signals: WorkerSignals, farm, duration=None,
+                       enable_text=True, hardware_accel="CPU", overlay_renderer="png", segment_seconds=0, stats=None,
+                       profile=DEFAULT_PROFILE):
+    """
+    Segment-parallel variant of add_text_overlay_to_video (see
+    segment_encode.py). Must be called outside the farm's slots, since the
+    segments themselves run in them. Returns False so the caller can fall back.
+    """
+    video_codec, final_preset = resolve_encoder(ffmpeg_preset, hardware_accel, profile.encoder)
+    if profile.rate_control == "2pass":
+        # Parçalar için 2-pass anlamsız (her parça ayrı istatistik): bitrate tavanlı CRF kullan
+        profile = profile._replace(rate_control="capped_crf")
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    def build_command(segment_path, segment_output):
+        return build_encode_command(segment_path, [(segment_output, text)], video_codec, final_preset, signals,
+                                    enable_text, overlay_renderer, farm.threads, profile)
+
+    work_dir = output_path.parent / f".segments_{output_path.stem}"
+    started = time.perf_counter()
+    result = encode_segmented(input_path, output_path, build_command, farm, work_dir, duration, profile.fps,
+                              signals.log_message.emit, segment_seconds,
+                              lambda done, total: signals.progress.emit(40 + int(done / total * 55)))
+    if not result:
+        return False
+    seconds = time.perf_counter() - started
+    if stats is not None:
+        stats.update({"frames": result["frames"], "seconds": round(seconds, 2), "segments": result["segments"],
+                      "fps": round(result["frames"] / seconds, 2) if seconds > 0 else 0.0})
+    signals.log_message.emit(f"✅ Video processing complete: {output_path.name} ({result['segments']} segments, "
+                             f"{result['frames']} frames, {result['frames'] / seconds:.1f} fps avg, {seconds:.0f}s)")
+    return True
+
+def add_text_overlay_to_video(input_path, output_path, text, ffmpeg_preset, signals: WorkerSignals, enable_text=True, hardware_accel="CPU", overlay_renderer="png",
+                              duration=None, stats=None, progress_range=(40, 100), farm=None, profile=DEFAULT_PROFILE):
+    return add_text_overlays_to_video(input_path, [(output_path, text)], ffmpeg_preset, signals, enable_text, hardware_accel, overlay_renderer,
+                                      duration, stats, progress_range, farm, profile)
+
+def add_text_overlays_to_video(input_path, outputs, ffmpeg_preset, signals: WorkerSignals, enable_text=True, hardware_accel="CPU", overlay_renderer="png",
+                               duration=None, stats=None, progress_range=(40, 100), farm=None, profile=DEFAULT_PROFILE):
+    """
+    Encodes one file per (output_path, text) pair in ``outputs`` with a single
+    ffmpeg call: the source is decoded and scaled once, then split into one
+    overlay branch per output. duration (seconds of the source) is used for
+    the progress bar and ETA; progress_range is the part of the bar it fills.
+    farm supplies the -threads value and tracks the ffmpeg process; profile
+    sets the output resolution, frame rate and bitrate.
+    """
+    size = f"{profile.width}x{profile.height}/{profile.fps:g}fps"
+    if len(outputs) == 1:
+        signals.log_message.emit(f"⏳ Processing ({size}) | Text: {'ON' if enable_text else 'OFF'} | Encoder: {hardware_accel}")
+    else:
+        signals.log_message.emit(f"⏳ Processing ({size}) | {len(outputs)} outputs, single decode | Text: {'ON' if enable_text else 'OFF'} | Encoder: {hardware_accel}")
+
+    try:
+        video_codec, final_preset = resolve_encoder(ffmpeg_preset, hardware_accel, profile.encoder)
+        for output_path, _ in outputs:
+            Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+        threads = farm.threads if farm is not None else 0
+        names = ", ".join(Path(p).name for p, _ in outputs)
+        if profile.rate_control != "2pass" or not ENCODERS[video_codec].supports("2pass"):
+            ffmpeg_cmd = build_encode_command(input_path, outputs, video_codec, final_preset, signals, enable_text, overlay_renderer, threads, profile)
+            return run_ffmpeg(ffmpeg_cmd, signals, f"✅ Video processing complete: {names}", duration, stats, progress_range, farm)
+
+        # 2-pass: ilk geçiş progress barın ilk yarısını, ikinci geçiş kalanını doldurur
+        bar_start, bar_end = progress_range or (0, 0)
+        bar_middle = bar_start + (bar_end - bar_start) // 2
+        try:
+            first_pass = build_encode_command(input_path, outputs, video_codec, final_preset, signals, enable_text, overlay_renderer, threads, profile, 1)
+            if not run_ffmpeg(first_pass, signals, f"✅ First pass complete: {names}", duration, None,
+                              (bar_start, bar_middle) if progress_range else None, farm):
+                return False
+            second_pass = build_encode_command(input_path, outputs, video_codec, final_preset, signals, enable_text, overlay_renderer, threads, profile, 2)
+            return run_ffmpeg(second_pass, signals, f"✅ Video processing complete: {names} (2-pass)", duration, stats,
+                              (bar_middle, bar_end) if progress_range else None, farm)
+        finally:
+            for output_path, _ in outputs:
+                for log_path in Path(output_path).parent.glob(Path(passlog_prefix(output_path)).name + "*"):
+                    log_path.unlink(missing_ok=True)
+
     except Exception as e:
         signals.log_message.emit(f"❌ Error during text overlay: {e}\n{traceback.format_exc()}")
         return False
 
 
 # --- AI and Translation Functions ---
-def generate_text_with_openai(client, prompt, model):
+SYSTEM_PROMPT = "You are a helpful assistant for creating viral YouTube shorts content."
+
+# Aynı prompt için tekrar para ödememek adına kalıcı OpenAI cevap önbelleği (configure_llm_cache ile açılır)
+_llm_cache = None
+
+def configure_llm_cache(settings):
+    global _llm_cache
+    if _llm_cache is not None:
+        _llm_cache.close()
+        _llm_cache = None
+    if get_processing_setting(settings, "llm_cache_enabled"):
+        _llm_cache = PersistentCache(
+            "llm",
+            ttl_seconds=get_processing_setting(settings, "llm_cache_ttl_days") * 86400,
+            max_bytes=get_processing_setting(settings, "llm_cache_max_mb") * 1024 * 1024,
+        )
+    return _llm_cache
+
+def generate_text_with_openai(client, prompt, model, system_prompt=SYSTEM_PROMPT, max_tokens=1500, temperature=0.7, timeout=None, use_cache=True,
+                              validate=None):
+    """
+    Chat completion with the persistent LLM cache. A reply is only cached if
+    validate(text) is truthy (when given), so a malformed reply is asked for
+    again on retry instead of being replayed from the cache.
+    """
+    cache = _llm_cache if use_cache else None
+    cache_key = make_key(model, system_prompt, prompt, temperature) if cache else None
+    if cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
     try:
         response = client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": "You are a helpful assistant for creating viral YouTube shorts content."},
+                {"role": "system", "content": system_prompt},
                 {"role": "user", "content": prompt}
             ],
-            max_tokens=1500, temperature=0.7,
+            max_tokens=max_tokens, temperature=temperature,
+            **({"timeout": timeout} if timeout else {}),
         )
-        return response.choices[0].message.content.strip()
+        text = response.choices[0].message.content.strip()
+        if cache and text and (validate is None or validate(text)):
+            cache.put(cache_key, text)
+        return text
     except Exception as e:
         print(f"OpenAI API Error: {e}"); return None
 
-def generate_motivational_sentence(client, model):
+def run_bounded(calls, max_workers, stop_event=None, poll_interval=0.2):
+    """
+    Runs zero-argument callables on a thread pool with at most max_workers in
+    flight and returns their results in order. A call that raises gives None.
+    If stop_event is set, pending calls are cancelled and unfinished results
+    are None.
+    """
+    results = [None] * len(calls)
+    if not calls: return results
+    executor = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(calls))))
+    futures = {executor.submit(call): i for i, call in enumerate(calls)}
+    pending = set(futures)
+    try:
+        while pending:
+            if stop_event is not None and stop_event.is_set():
+                break
+            done, pending = wait(pending, timeout=poll_interval, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results[futures[future]] = future.result()
+                except Exception as e:
+                    print(f"Background call failed: {e}")
+    finally:
+        # Durdurulduysa bekleyen istekleri iptal et, çalışanları bekleme
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+def generate_motivational_sentence(client, model, timeout=None):
     prompt = "Generate a short, reverse-psychology motivational quote. Keep it under 10 words. Do not use emojis or quotes. Example: You're not good enough. Prove me wrong."
-    return generate_text_with_openai(client, prompt, model) or "Go ahead, prove them right."
+    # Prompt hiç değişmez: önbellek her videoya aynı sözü verirdi (tekrar denemede söz manifest'ten gelir)
+    return generate_text_with_openai(client, prompt, model, timeout=timeout, use_cache=False) or "Go ahead, prove them right."
 
-def translate_text(text, target_lang_code, signals: WorkerSignals):
-    try:
-        return GoogleTranslator(source='auto', target=target_lang_code).translate(text)
-    except Exception as e:
-        signals.log_message.emit(f"❌ Translation to '{target_lang_code}' failed: {e}")
-        return text
+# Önbellekli çeviri katmanı (configure_translator ile kalıcı önbellek bağlanır)
+_translator = None
 
-def generate_seo_metadata(client, model, video_data, lang_key, signals: WorkerSignals):
-    target_lang_code = LANG_CODE_MAP[lang_key]; target_lang_name = SUPPORTED_LANGUAGES[lang_key]
-    signals.log_message.emit(f"⏳ Generating SEO metadata for {target_lang_name}...")
-    
-    context_title = translate_text(video_data.get('title', ''), target_lang_code, signals)
-    context_description = translate_text(video_data.get('description', ''), target_lang_code, signals)
-    context = f"Original Title: {context_title}\nOriginal Description: {context_description[:500]}"
-    
-    # Promptları biraz daha kesinleştirdim
-    prompt_title = f"Create a viral, SEO-optimized YouTube Shorts title in {target_lang_name} under 60 characters. Do not use quotation marks. Context:\n{context}"
-    prompt_description = f"Write a compelling, 2-3 sentence YouTube Shorts description in {target_lang_name}. Context:\n{context}"
-    prompt_tags = f"List 5-10 relevant YouTube tags in {target_lang_name}, comma-separated. Context:\n{context}"
-    
-    title = generate_text_with_openai(client, prompt_title, model)
-    description = generate_text_with_openai(client, prompt_description, model)
-    tags_str = generate_text_with_openai(client, prompt_tags, model)
-    
-    if not all([title, description, tags_str]):
-        signals.log_message.emit(f"❌ Failed to generate SEO metadata for {target_lang_name}."); return None
-    
+def configure_translator(settings):
+    global _translator
+    if _translator is not None and _translator.persistent_cache is not None:
+        # Önceki çalıştırmanın SQLite bağlantısı açık kalmasın
+        _translator.persistent_cache.close()
+    persistent_cache = None
+    if get_processing_setting(settings, "translation_cache_enabled"):
+        persistent_cache = PersistentCache(
+            "translate",
+            ttl_seconds=get_processing_setting(settings, "translation_cache_ttl_days") * 86400,
+            max_bytes=get_processing_setting(settings, "translation_cache_max_mb") * 1024 * 1024,
+        )
+    _translator = Translator(persistent_cache, max_workers=get_processing_setting(settings, "openai_concurrency"))
+    return _translator
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        _translator = Translator()
+    return _translator
+
+def translate_text(text, target_lang_code, signals: WorkerSignals, source_lang_code='auto'):
+    return get_translator().translate(text, target_lang_code, source_lang_code, signals.log_message.emit)
+
+def clean_title(title):
     # --- TEMİZLİK OPERASYONU (Tırnak Silici) ---
     # 1. Çift tırnakları sil (")
     title = title.replace('"', '')
@@ -243,13 +535,194 @@ def generate_seo_metadata(client, model, video_data, lang_key, signals: WorkerSi
     # Bazen AI "Title: Milyarder..." diye cevap verir, "Title:" kısmını silelim
     if ":" in title:
         title = title.split(":")[-1].strip()
-    # -------------------------------------------
+    return title
+
+CONTEXT_DESCRIPTION_CHARS = 500
+
+def truncate_text(text, max_chars):
+    """Cuts text to at most max_chars, preferring the last word boundary."""
+    if len(text) <= max_chars: return text
+    cut = text[:max_chars]
+    space = cut.rfind(" ")
+    return cut[:space] if space > max_chars // 2 else cut
+
+def detect_source_language(video_data):
+    """Language of the video's title/description ('auto' if it cannot be detected)."""
+    sample = f"{video_data.get('title', '')}\n{truncate_text(video_data.get('description', ''), CONTEXT_DESCRIPTION_CHARS)}"
+    try:
+        detected = detect(sample) if sample.strip() else 'auto'
+    except LangDetectException:
+        return 'auto'
+    # Sadece desteklediğimiz kodlara güven (langdetect 'zh-cn' gibi çevirmenin tanımadığı kodlar da döndürebilir)
+    return detected if detected in LANG_CODE_MAP.values() else 'auto'
+
+def build_seo_contexts(video_data, lang_keys, signals: WorkerSignals):
+    """
+    Original title/description in every target language. The description is
+    cut to the 500 characters the prompt uses *before* translating, the source
+    language is detected once, and targets matching it are not translated.
+    """
+    full_description = video_data.get('description', '')
+    description = truncate_text(full_description, CONTEXT_DESCRIPTION_CHARS)
+    source = video_data.get('_source_lang') or detect_source_language(video_data)
+    video_data['_source_lang'] = source  # Video başına bir kez tespit et
+
+    texts = [video_data.get('title', ''), description]
+    stats = {}
+    translated = get_translator().translate_many(texts, [LANG_CODE_MAP[k] for k in lang_keys], source=source,
+                                                 log=signals.log_message.emit, stats=stats)
 
+    # Dil başına gönderilen byte ve gecikmeyi logla
+    full_bytes = len(texts[0].encode('utf-8')) + len(full_description.encode('utf-8'))
+    for lang_key in lang_keys:
+        st = stats.get(LANG_CODE_MAP[lang_key], {})
+        if st.get("skipped"):
+            signals.log_message.emit(f"🌐 {lang_key}: translation skipped (source language is {source})")
+        else:
+            signals.log_message.emit(f"🌐 {lang_key}: {st.get('bytes', 0)} B sent (full text: {full_bytes} B), "
+                                     f"{st.get('seconds', 0.0):.2f}s, {st.get('cached', 0)} cached")
+
+    contexts = {}
+    for lang_key in lang_keys:
+        context_title, context_description = translated[LANG_CODE_MAP[lang_key]]
+        contexts[lang_key] = f"Original Title: {context_title}\nOriginal Description: {context_description[:CONTEXT_DESCRIPTION_CHARS]}"
+    return contexts
+
+def build_seo_prompts(video_data, lang_key, signals: WorkerSignals, context=None):
+    target_lang_name = SUPPORTED_LANGUAGES[lang_key]
+    if context is None:
+        context = build_seo_contexts(video_data, [lang_key], signals)[lang_key]
+    
+    # Promptları biraz daha kesinleştirdim
+    return {
+        "title": f"Create a viral, SEO-optimized YouTube Shorts title in {target_lang_name} under 60 characters. Do not use quotation marks. Context:\n{context}",
+        "description": f"Write a compelling, 2-3 sentence YouTube Shorts description in {target_lang_name}. Context:\n{context}",
+        "tags": f"List 5-10 relevant YouTube tags in {target_lang_name}, comma-separated. Context:\n{context}",
+    }
+
+def assemble_seo_metadata(lang_key, title, description, tags_str, signals: WorkerSignals):
+    target_lang_name = SUPPORTED_LANGUAGES[lang_key]
+    if not all([title, description, tags_str]):
+        signals.log_message.emit(f"❌ Failed to generate SEO metadata for {target_lang_name}."); return None
+    
+    title = clean_title(title)
     tags = [tag.strip() for tag in tags_str.split(',') if tag.strip()]
     
     signals.log_message.emit(f"✅ SEO metadata generated for {target_lang_name}: {title}")
     return {"title": title, "description": description, "tags": tags}
 
+def generate_seo_metadata(client, model, video_data, lang_key, signals: WorkerSignals):
+    signals.log_message.emit(f"⏳ Generating SEO metadata for {SUPPORTED_LANGUAGES[lang_key]}...")
+    prompts = build_seo_prompts(video_data, lang_key, signals)
+    title = generate_text_with_openai(client, prompts["title"], model)
+    description = generate_text_with_openai(client, prompts["description"], model)
+    tags_str = generate_text_with_openai(client, prompts["tags"], model)
+    return assemble_seo_metadata(lang_key, title, description, tags_str, signals)
+
+def generate_seo_metadata_concurrent(client, model, video_data, lang_keys, signals: WorkerSignals,
+                                     stop_event=None, max_concurrency=8, timeout=None):
+    """
+    Per-language SEO metadata with every prompt (3 per language) in flight at
+    once, bounded by max_concurrency. Returns {lang_key: metadata} for the
+    languages that succeeded.
+    """
+    if not lang_keys: return {}
+    names = ", ".join(SUPPORTED_LANGUAGES[k] for k in lang_keys)
+    signals.log_message.emit(f"⏳ Generating SEO metadata for {names} ({max_concurrency} parallel requests)...")
+
+    contexts = build_seo_contexts(video_data, lang_keys, signals)
+    if stop_event is not None and stop_event.is_set(): return {}
+    calls, slots = [], []
+    for lang_key in lang_keys:
+        prompts = build_seo_prompts(video_data, lang_key, signals, contexts[lang_key])
+        for field in ("title", "description", "tags"):
+            calls.append(lambda p=prompts[field]: generate_text_with_openai(client, p, model, timeout=timeout))
+            slots.append((lang_key, field))
+    replies = run_bounded(calls, max_concurrency, stop_event)
+    if stop_event is not None and stop_event.is_set(): return {}
+
+    answers = {}
+    for (lang_key, field), reply in zip(slots, replies):
+        answers.setdefault(lang_key, {})[field] = reply
+    results = {}
+    for lang_key in lang_keys:
+        fields = answers.get(lang_key, {})
+        metadata = assemble_seo_metadata(lang_key, fields.get("title"), fields.get("description"), fields.get("tags"), signals)
+        if metadata: results[lang_key] = metadata
+    return results
+
+# Toplu (tek istek) SEO çıktısında her dil için beklenen alanlar
+SEO_METADATA_SCHEMA = {"title": str, "description": str, "tags": list}
+
+def parse_json_object(text):
+    """Extracts the first JSON object from a model reply (tolerates ```json fences and chatter)."""
+    if not text: return None
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end <= start: return None
+    try:
+        data = json.loads(text[start:end + 1])
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def validate_seo_entry(entry):
+    """Checks one language's entry against SEO_METADATA_SCHEMA; returns the normalized dict or None."""
+    if not isinstance(entry, dict): return None
+    tags = entry.get("tags")
+    if isinstance(tags, str):
+        entry = {**entry, "tags": [tag for tag in tags.split(",")]}
+    for key, expected_type in SEO_METADATA_SCHEMA.items():
+        if not isinstance(entry.get(key), expected_type) or not entry[key]:
+            return None
+    tags = [str(tag).strip().lstrip("#") for tag in entry["tags"] if str(tag).strip()]
+    title = clean_title(entry["title"])
+    description = entry["description"].strip()
+    if not title or not description or not tags:
+        return None
+    return {"title": title, "description": description, "tags": tags}
+
+def generate_seo_metadata_batch(client, model, video_data, lang_keys, signals: WorkerSignals, timeout=None):
+    """
+    Asks for every language's title/description/tags in a single completion
+    returning one JSON object. Returns {lang_key: metadata} for the languages
+    whose entries passed validation; the caller falls back per language for
+    the rest.
+    """
+    lang_list = ", ".join(f'"{LANG_CODE_MAP[k]}" ({SUPPORTED_LANGUAGES[k]})' for k in lang_keys)
+    context = f"Original Title: {video_data.get('title', '')}\nOriginal Description: {truncate_text(video_data.get('description', ''), CONTEXT_DESCRIPTION_CHARS)}"
+    prompt = (
+        "Create YouTube Shorts SEO metadata for the video below in each of these languages: "
+        f"{lang_list}.\n"
+        "Reply with only one JSON object whose keys are those language codes. Each value must be an object with:\n"
+        '  "title": a viral, SEO-optimized title in that language under 60 characters, without quotation marks,\n'
+        '  "description": a compelling 2-3 sentence description in that language,\n'
+        '  "tags": a list of 5-10 relevant YouTube tags in that language.\n'
+        f"Context:\n{context}"
+    )
+
+    signals.log_message.emit(f"⏳ Generating SEO metadata for {len(lang_keys)} languages in one request...")
+    def reply_is_complete(text):
+        data = parse_json_object(text)
+        return data is not None and all(validate_seo_entry(data.get(LANG_CODE_MAP[k])) for k in lang_keys)
+
+    reply = generate_text_with_openai(client, prompt, model, max_tokens=600 + 350 * len(lang_keys), timeout=timeout,
+                                      validate=reply_is_complete)
+    data = parse_json_object(reply)
+    if data is None:
+        signals.log_message.emit("⚠️ Batched SEO reply was not valid JSON; falling back to per-language requests.")
+        return {}
+
+    results = {}
+    for lang_key in lang_keys:
+        metadata = validate_seo_entry(data.get(LANG_CODE_MAP[lang_key]))
+        if metadata:
+            results[lang_key] = metadata
+            signals.log_message.emit(f"✅ SEO metadata generated for {SUPPORTED_LANGUAGES[lang_key]}: {metadata['title']}")
+    missing = [k for k in lang_keys if k not in results]
+    if missing:
+        signals.log_message.emit(f"⚠️ Batched SEO reply missing/invalid for: {', '.join(missing)}; retrying those individually.")
+    return results
+
 def save_seo_metadata(video_id, metadata, lang_key, output_base_dir, signals: WorkerSignals):
     lang_output_dir = output_base_dir / video_id / lang_key
     lang_output_dir.mkdir(parents=True, exist_ok=True)
@@ -263,12 +736,479 @@ def save_seo_metadata(video_id, metadata, lang_key, output_base_dir, signals: Wo
 # --- Main Processing Workflow ---
 class InterruptedError(Exception): pass
 
+# Arayüzden ayarlanmayan gelişmiş işlem ayarları (app_settings.json içinden değiştirilebilir)
+DEFAULT_PROCESSING_SETTINGS = {
+    # Her aşamada aynı anda kaç iş çalışsın (encode aşaması encode_slots kadar video alır)
+    "pipeline_workers": {"download": 1, "metadata": 2, "upload": 1},
+    # Aşamalar arası kuyruk boyutu (kaç video bir sonraki aşamayı bekleyebilir)
+    "pipeline_queue_size": 2,
+    # Tüm diller tek ffmpeg çağrısında: kaynak bir kez çözülür/ölçeklenir, N çıktı yazılır
+    "multi_output_encode": True,
+    # Donanım encoder'larında (NVENC/AMF) aynı anda açık oturum sınırı, tüm slotlar toplamı (0 = varsayılan 4)
+    "hardware_sessions": 0,
+    # "png": yazı kutusu bir kez PIL ile çizilip overlay edilir, "drawtext": her karede ffmpeg çizer
+    "overlay_renderer": "png",
+    # Tüm dillerin SEO verisi tek OpenAI isteğinde (JSON); bozuk gelen diller tek tek tekrar istenir
+    "batched_metadata": True,
+    # Aynı anda en fazla kaç OpenAI/çeviri isteği, ve istek başına zaman aşımı (saniye)
+    "openai_concurrency": 8,
+    "openai_timeout": 60,
+    # OpenAI cevap önbelleği (kapatmak için llm_cache_enabled: false)
+    "llm_cache_enabled": True,
+    "llm_cache_ttl_days": 30,
+    "llm_cache_max_mb": 64,
+    # Çeviri önbelleği (bellek LRU + kalıcı)
+    "translation_cache_enabled": True,
+    "translation_cache_ttl_days": 90,
+    "translation_cache_max_mb": 32,
+    # İndirilen kaynaklar: boşsa output_dir/<video_id>/ kullanılır; boyut sınırı 0 = sınırsız (LRU ile silinir)
+    "source_cache_dir": "",
+    "source_cache_max_gb": 0,
+    # İndirmeden önce yalnızca metadata ile kontrol (süre, en-boy oranı, erişilebilirlik, çözünürlük)
+    "preflight": dict(PREFLIGHT_RULES),
+    # yt-dlp ağ ayarları; external_downloader: "auto" = PATH'te varsa aria2c, "" = yt-dlp'nin kendi indiricisi
+    "download": {
+        "concurrent_fragments": 4,
+        "external_downloader": "auto",
+        "external_downloader_args": ["-x", "8", "-s", "8", "-k", "1M"],
+        "http_chunk_size_mb": 10,
+        "socket_timeout": 20,
+        "retries": 10,
+        "fragment_retries": 10,
+        # İlerleme en fazla progress_interval saniyede bir güncellenir; stall_timeout boyunca veri gelmezse indirme yeniden başlar
+        "progress_interval": 0.25,
+        "progress_log_interval": 5,
+        "stall_timeout": 30,
+        "stall_retries": 2,
+    },
+    # Sıradaki kaç linkin kaynağı arka planda önden indirilsin (0 = kapalı) ve disk sınırları
+    "prefetch_window": 2,
+    "prefetch_max_gb": 10,
+    "prefetch_min_free_gb": 5,
+    # Aynı anda kaç ffmpeg encode çalışsın ve her biri kaç thread kullansın (0 = çekirdek sayısı ve CPU yüküne göre)
+    "encode_slots": 0,
+    "encode_threads": 0,
+    # Uzun kaynakları keyframe'lerden bölüp parçaları paralel encode et (birden fazla slot gerekir)
+    "segment_encode": False,
+    "segment_min_duration": 60,   # saniye; daha kısa kaynaklar tek parça encode edilir
+    "segment_seconds": 0,         # 0 = süre / slot sayısı
+    # Ucuz kaynak seçimi: çıktı çözünürlüğünü aşmayan H.264 akışlar tercih edilir
+    "prefer_cheap_formats": True,
+    # Yazı yoksa ve kaynak zaten 1440x2560@60 H.264 ise encode yerine stream copy
+    "stream_copy": True,
+    # Çıktı çözünürlüğü/fps/bitrate kaynağa göre seçilir (ffprobe); bunlar üst sınırlardır
+    "output_profile": dict(OUTPUT_PROFILE_CEILINGS),
+    # encoders.py kaydından encoder ("auto" = donanım seçimine göre) ve hız kontrolü: bitrate, crf, capped_crf, 2pass
+    "encoder": "auto",
+    "rate_control": "bitrate",
+    "crf": None,                  # None = encoder'ın varsayılanı
+    # Başarısız bir link kaç kez denensin (her deneme tamamlanan adımları atlar)
+    "max_attempts": 3,
+}
+
+def get_processing_setting(settings, key):
+    value = (settings or {}).get(key)
+    default = DEFAULT_PROCESSING_SETTINGS[key]
+    if isinstance(default, dict):
+        return {**default, **(value or {})}
+    return default if value is None else value
+
+
+class VideoJob:
+    """State of one link while it moves through the pipeline stages."""
+    def __init__(self, link, number):
+        self.link = link
+        self.number = number
+        self.start_time = time.time()
+        self.video_info = None
+        self.video_id = None
+        self.original_video_path = None
+        self.motivation_sentence = ""
+        self.seo_metadata = {}       # lang_key -> {"title","description","tags"}
+        self.overlay_texts = {}      # lang_key -> text
+        self.upload_packages = []
+        self.manifest = None         # output_dir/<video_id>/manifest.json
+        self.source_pinned = False   # encode bitene kadar kaynak LRU ile silinmesin
+
+
+class ProcessingContext:
+    """Everything the stage functions share for one process_link run."""
+    def __init__(self, client, output_base_dir, openai_model, yt_dlp_quality, ffmpeg_preset,
+                 signals, stop_event, enable_overlay, hardware_accel, settings):
+        self.client = client
+        self.output_base_dir = output_base_dir
+        self.openai_model = openai_model
+        self.yt_dlp_quality = yt_dlp_quality
+        self.ffmpeg_preset = ffmpeg_preset
+        self.signals = signals
+        self.stop_event = stop_event
+        self.enable_overlay = enable_overlay
+        self.hardware_accel = hardware_accel
+        self.settings = settings or {}
+        self.lock = threading.Lock()
+        self.processed_count = 0
+        self.total_time = 0
+        self.in_flight = 0
+        self.link_queue = None
+        self.used_links_file_path = None
+        cache_dir = get_processing_setting(self.settings, "source_cache_dir")
+        self.preflight = None
+        self.prefetcher = None
+        self.transcodes_skipped = 0
+        self.encode_farm = None
+        self.probe_cache = None
+        self.source_cache = SourceCache(Path(cache_dir) if cache_dir else output_base_dir,
+                                        int(get_processing_setting(self.settings, "source_cache_max_gb") * 1024 ** 3))
+
+    def job_done(self, job, success, error=None):
+        """
+        success=True finishes the link in the queue and logs it to used_link.txt;
+        success=False puts it back in the queue until max_attempts is used up;
+        success=None (dropped by Stop) leaves it claimed so the next run picks
+        it up again.
+        """
+        if job.video_id and job.source_pinned:
+            self.source_cache.unpin(job.video_id)
+            job.source_pinned = False
+        if success is False and job.manifest is not None:
+            job.manifest.record_attempt(error)
+        if success is not None and self.link_queue is not None:
+            finished = True
+            if success:
+                self.link_queue.complete(job.link)
+            else:
+                max_attempts = get_processing_setting(self.settings, "max_attempts")
+                requeued, attempts = self.link_queue.retry_or_fail(job.link, error or "", max_attempts)
+                finished = not requeued
+                if requeued:
+                    self.signals.log_message.emit(f"🔁 Requeued {job.link} (attempt {attempts}/{max_attempts} failed); finished steps will be skipped.")
+            if finished:
+                append_line_to_file(self.used_links_file_path, job.link)
+        with self.lock:
+            self.in_flight -= 1
+            if success:
+                self.processed_count += 1
+                self.total_time += int(time.time() - job.start_time)
+            return self.processed_count, self.total_time
+
+
+def _stage_download(job, ctx):
+    signals = ctx.signals
+    signals.log_message.emit(f"▶️ [{job.number}] Processing: {job.link}")
+    signals.progress.emit(10)
+
+    video_id = get_video_id(job.link)
+    job.manifest = VideoManifest(ctx.output_base_dir / video_id, video_id) if video_id else None
+    if video_id:
+        job.video_id = video_id
+        ctx.source_cache.pin(video_id)
+        job.source_pinned = True
+    if ctx.prefetcher:
+        # Bu link arka planda iniyorsa ikinci kez indirme, bitmesini bekle
+        ctx.prefetcher.wait_for(job.link, ctx.stop_event)
+        ctx.prefetcher.release(job.link)
+    preflight_info = ctx.preflight.take_info(job.link) if ctx.preflight else None
+    video_info = load_checkpointed_download(job.manifest, signals) if job.manifest else None
+    if video_info is None:
+        video_info = download_video_and_metadata(job.link, ctx.output_base_dir, ctx.yt_dlp_quality, signals,
+                                                 ctx.source_cache, preflight_info, ctx.stop_event,
+                                                 get_processing_setting(ctx.settings, "download"),
+                                                 get_processing_setting(ctx.settings, "prefer_cheap_formats"))
+        if not video_info or 'downloaded_filepath' not in video_info:
+            raise ValueError("Download failed.")
+        if job.manifest:
+            downloaded = Path(video_info['downloaded_filepath'])
+            job.manifest.record_download(downloaded, downloaded.with_suffix('.info.json'))
+
+    job.video_info = video_info
+    job.video_id = video_info.get('id') or video_id
+    job.original_video_path = Path(video_info['downloaded_filepath'])
+    signals.progress.emit(30)
+    return job
+
+def load_checkpointed_download(manifest, signals: WorkerSignals):
+    """Info dict of a download recorded in the manifest whose files are still intact, else None."""
+    verified = manifest.verified_download()
+    if not verified or not verified[1]:
+        return None
+    video_path, info_json_path = verified
+    try:
+        with open(info_json_path, 'r', encoding='utf-8') as f:
+            video_info = json.load(f)
+    except (OSError, ValueError):
+        return None
+    video_info['downloaded_filepath'] = str(video_path)
+    signals.log_message.emit(f"♻️ Reusing verified download: {video_path.name}")
+    return video_info
+
+def _stage_metadata(job, ctx):
+    signals = ctx.signals
+    langs = list(ENABLED_LANGUAGES)
+    concurrency = get_processing_setting(ctx.settings, "openai_concurrency")
+    timeout = get_processing_setting(ctx.settings, "openai_timeout")
+    manifest = job.manifest
+
+    # Önceki denemede üretilen söz ve SEO verileri manifest'ten gelir; yalnızca eksikler istenir
+    stored_quote = manifest.data["quote"] if manifest else None
+    seo_by_lang = {}
+    for lang_key in langs:
+        stored = manifest.metadata_for(lang_key) if manifest else None
+        if stored: seo_by_lang[lang_key] = stored["seo"]
+    pending = [lang_key for lang_key in langs if lang_key not in seo_by_lang]
+    need_quote = ctx.enable_overlay and not stored_quote
+    if len(pending) < len(langs):
+        signals.log_message.emit(f"♻️ Reusing checkpointed metadata for {len(langs) - len(pending)} language(s).")
+    batched = get_processing_setting(ctx.settings, "batched_metadata") and len(pending) > 1
+
+    # Söz ve (toplu) SEO isteği birbirinden bağımsız: aynı anda gönder
+    calls = [
+        lambda: generate_motivational_sentence(ctx.client, ctx.openai_model, timeout) if need_quote else "",
+        lambda: generate_seo_metadata_batch(ctx.client, ctx.openai_model, job.video_info, pending, signals, timeout) if batched else {},
+    ]
+    if need_quote: signals.log_message.emit("⏳ Generating motivation...")
+    quote, batch_metadata = run_bounded(calls, concurrency, ctx.stop_event)
+    if ctx.stop_event.is_set(): return None
+    if ctx.enable_overlay:
+        job.motivation_sentence = stored_quote or quote or "Go ahead, prove them right."
+        if manifest and not stored_quote: manifest.record_quote(job.motivation_sentence)
+        signals.log_message.emit(f"✅ Quote: '{job.motivation_sentence}'")
+
+    seo_by_lang.update(batch_metadata or {})
+    missing = [lang_key for lang_key in langs if lang_key not in seo_by_lang]
+    seo_by_lang.update(generate_seo_metadata_concurrent(ctx.client, ctx.openai_model, job.video_info, missing, signals,
+                                                        ctx.stop_event, concurrency, timeout))
+    if ctx.stop_event.is_set(): return None
+
+    overlay_langs = [lang_key for lang_key in langs if lang_key in seo_by_lang]
+    # Aynı söz için önceki denemede çevrilmiş yazılar tekrar çevrilmez
+    stored_texts = {}
+    if ctx.enable_overlay and stored_quote:
+        for lang_key in overlay_langs:
+            stored = manifest.metadata_for(lang_key)
+            if stored and stored.get("overlay_text"): stored_texts[lang_key] = stored["overlay_text"]
+    to_translate = [lang_key for lang_key in overlay_langs if lang_key not in stored_texts]
+    translations = {}
+    if ctx.enable_overlay and to_translate:
+        # Söz İngilizce üretiliyor: 'en' için ağa hiç gidilmez, tekrar eden sözler önbellekten gelir
+        translated = get_translator().translate_many([job.motivation_sentence], [LANG_CODE_MAP[k] for k in to_translate],
+                                                     source='en', log=signals.log_message.emit)
+        translations = {k: translated[LANG_CODE_MAP[k]][0] for k in to_translate}
+
+    for lang_key in overlay_langs:
+        job.seo_metadata[lang_key] = seo_by_lang[lang_key]
+        if ctx.enable_overlay:
+            job.overlay_texts[lang_key] = stored_texts.get(lang_key) or translations.get(lang_key) or job.motivation_sentence
+        else:
+            job.overlay_texts[lang_key] = ""
+        if lang_key in pending:
+            save_seo_metadata(job.video_id, seo_by_lang[lang_key], lang_key, ctx.output_base_dir, signals)
+        if manifest and (lang_key in pending or lang_key in to_translate):
+            manifest.record_metadata(lang_key, seo_by_lang[lang_key], job.overlay_texts[lang_key])
+
+    if _llm_cache:
+        signals.log_message.emit(f"ℹ️ {_llm_cache.stats_line()}")
+    translator = get_translator()
+    if translator.persistent_cache:
+        signals.log_message.emit(f"ℹ️ {translator.persistent_cache.stats_line()} | {translator.network_calls} translation request(s) so far")
+    failed = [lang_key for lang_key in langs if lang_key not in seo_by_lang]
+    if failed:
+        # Eksik dil sessizce atlanırsa link 'done' olur ve o diller kaybolur; yeniden denemede
+        # tamamlanan diller manifest'ten gelir, yalnızca eksikler tekrar üretilir
+        raise RuntimeError(f"SEO metadata failed for: {', '.join(failed)}")
+    signals.progress.emit(40)
+    return job
+
+def link_or_reference(master_path, target_path):
+    """
+    Makes target_path a hardlink of master_path. Returns the path the upload
+    package should use: the hardlink, or the master itself if linking is not
+    possible (e.g. FAT32 or a different drive).
+    """
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if target_path.exists() or target_path.is_symlink():
+            target_path.unlink()
+        os.link(master_path, target_path)
+        return target_path
+    except OSError:
+        return master_path
+
+def select_output_profile(video_path, ctx):
+    """(profile, ffprobe result) for the source; the fixed 2K/60 profile if the engine is off or ffprobe fails."""
+    rules = get_processing_setting(ctx.settings, "output_profile")
+    encoding = {"encoder": get_processing_setting(ctx.settings, "encoder"),
+                "rate_control": get_processing_setting(ctx.settings, "rate_control"),
+                "crf": get_processing_setting(ctx.settings, "crf")}
+    if not rules["enabled"]:
+        return DEFAULT_PROFILE._replace(**encoding), None
+    try:
+        probe = probe_source(video_path, ctx.probe_cache)
+    except Exception as e:
+        ctx.signals.log_message.emit(f"⚠️ ffprobe failed ({e}); using the default output profile.")
+        return DEFAULT_PROFILE._replace(**encoding), None
+    profile = choose_profile(probe, rules)._replace(**encoding)
+    ctx.signals.log_message.emit(f"📐 Output profile: {describe_profile(profile, probe)}")
+    return profile, probe
+
+def _stage_encode(job, ctx):
+    signals = ctx.signals
+    manifest = job.manifest
+    all_langs = [lang_key for lang_key in ENABLED_LANGUAGES if lang_key in job.seo_metadata]
+    video_dir = ctx.output_base_dir / job.video_id
+    output_paths = {lang_key: video_dir / lang_key / f"{lang_key}.mp4" for lang_key in all_langs}
+    texts = {lang_key: job.overlay_texts.get(lang_key, "") if ctx.enable_overlay else "" for lang_key in all_langs}
+
+    # Önceki denemede aynı yazıyla encode edilmiş ve dosyası sağlam olan diller tekrar encode edilmez
+    finished = {}
+    for lang_key in all_langs:
+        entry = manifest.verified_encode(lang_key, texts[lang_key]) if manifest else None
+        if entry: finished[lang_key] = entry
+    if finished:
+        signals.log_message.emit(f"♻️ Reusing checkpointed encodes for {len(finished)} language(s).")
+    langs = [lang_key for lang_key in all_langs if lang_key not in finished]
+
+    # Aynı yazıyı alan dillerin çıktısı byte-byte aynıdır (yazı kapalıyken hepsi): her farklı yazı için tek master encode et
+    groups = {}
+    for lang_key in langs:
+        groups.setdefault(texts[lang_key], []).append(lang_key)
+
+    masters = {}
+    for text, group in groups.items():
+        if len(group) == 1:
+            masters[text] = output_paths[group[0]]
+        elif not text:
+            masters[text] = video_dir / "master.mp4"
+        else:
+            masters[text] = video_dir / f"master_{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}.mp4"
+    if len(masters) < len(langs):
+        signals.log_message.emit(f"ℹ️ {len(langs)} languages share {len(masters)} distinct output(s); encoding each once.")
+
+    overlay_renderer = get_processing_setting(ctx.settings, "overlay_renderer")
+    profile, probe = select_output_profile(job.original_video_path, ctx) if groups else (DEFAULT_PROFILE, None)
+    duration = (probe or {}).get('duration') or (job.video_info or {}).get('duration')
+    farm = ctx.encode_farm
+    encoded = set()
+    encode_stats = {}
+    if "" in groups and get_processing_setting(ctx.settings, "stream_copy") and source_matches_output(job.video_info, probe, profile):
+        # Yazı yok ve kaynak zaten çıktı profilinde: yeniden encode etmeden kopyala
+        if ctx.stop_event.is_set(): return None
+        if remux_video(job.original_video_path, masters[""], source_audio_is_aac(job.video_info, probe), signals, profile):
+            encoded.add("")
+            with ctx.lock: ctx.transcodes_skipped += 1
+    pending = [text for text in groups if text not in encoded]
+
+    if (pending and get_processing_setting(ctx.settings, "segment_encode") and farm.slots > 1
+            and (duration or 0) >= get_processing_setting(ctx.settings, "segment_min_duration")):
+        # Uzun kaynak: her çıktı parçalara bölünüp tüm slotlarda encode edilir (bu thread slot tutmaz)
+        for text in pending:
+            if ctx.stop_event.is_set(): return None
+            stats = {}
+            if encode_in_segments(job.original_video_path, masters[text], text, ctx.ffmpeg_preset, signals, farm, duration,
+                                  ctx.enable_overlay, ctx.hardware_accel, overlay_renderer,
+                                  get_processing_setting(ctx.settings, "segment_seconds"), stats, profile):
+                encoded.add(text)
+                encode_stats[text] = stats
+        # Başarısız olanlar aşağıda tek parça encode edilir
+        pending = [text for text in pending if text not in encoded]
+
+    if not pending:
+        pass
+    elif get_processing_setting(ctx.settings, "multi_output_encode") and len(pending) > 1:
+        if ctx.stop_event.is_set(): return None
+        # NVENC/AMF çıktı başına bir oturum açar: komutlar oturum sınırına göre bölünür, slotlarda paralel çalışır
+        spec, _ = get_encoder(profile.encoder, ctx.hardware_accel)
+        per_command = outputs_per_command(len(pending), farm.slots, spec.hardware,
+                                          get_processing_setting(ctx.settings, "hardware_sessions"))
+        chunks = [pending[i:i + per_command] for i in range(0, len(pending), per_command)]
+        if len(chunks) > 1:
+            signals.log_message.emit(f"ℹ️ {spec.name}: {len(pending)} outputs split into {len(chunks)} commands "
+                                     f"(≤{per_command} encoder session(s) each).")
+        futures = []
+        for chunk in chunks:
+            stats = {}
+            outputs = [(masters[text], text) for text in chunk]
+            future = farm.submit(add_text_overlays_to_video, job.original_video_path, outputs, ctx.ffmpeg_preset, signals,
+                                 ctx.enable_overlay, ctx.hardware_accel, overlay_renderer, duration, stats,
+                                 (40, 100) if len(chunks) == 1 else None, farm, profile)
+            futures.append((chunk, stats, future))
+        for i, (chunk, stats, future) in enumerate(futures):
+            if future.result():
+                encoded.update(chunk)
+                encode_stats.update({text: stats for text in chunk})
+            if len(chunks) > 1: signals.progress.emit(40 + int((i + 1) / len(chunks) * 60))
+    else:
+        # Her dil ayrı bir ffmpeg işi; boş encode slotu varsa paralel çalışırlar
+        futures = {}
+        for i, text in enumerate(pending):
+            # Tek slotta sırayla çalışırlar: her encode progress barın kendi dilimini doldurur
+            bar_range = (40 + int(i / len(pending) * 60), 40 + int((i + 1) / len(pending) * 60)) if farm.slots == 1 else None
+            stats = {}
+            future = farm.submit(add_text_overlay_to_video, job.original_video_path, masters[text], text, ctx.ffmpeg_preset, signals,
+                                 ctx.enable_overlay, ctx.hardware_accel, overlay_renderer, duration, stats, bar_range, farm, profile)
+            futures[text] = (future, stats)
+        for i, (text, (future, stats)) in enumerate(futures.items()):
+            if future.result():
+                encoded.add(text)
+                encode_stats[text] = stats
+            signals.progress.emit(40 + int((i + 1) / len(pending) * 60))
+    if ctx.stop_event.is_set(): return None
+
+    for text, group in groups.items():
+        if text not in encoded: continue
+        for lang_key in group:
+            lang_path = output_paths[lang_key]
+            video_path = lang_path if masters[text] == lang_path else link_or_reference(masters[text], lang_path)
+            # Master'a referans: yükleme kaydı dil bazında tutulsun
+            upload_key = str(lang_path.resolve()) if video_path != lang_path else None
+            if manifest: manifest.record_encoded(lang_key, video_path, text, upload_key, encode_stats.get(text))
+            finished[lang_key] = {"video_path": video_path, "upload_key": upload_key}
+
+    for lang_key in all_langs:
+        if lang_key not in finished: continue
+        if manifest and manifest.is_uploaded(lang_key):
+            signals.log_message.emit(f"ℹ️ [{lang_key}] Already uploaded according to the manifest; not queued again.")
+            continue
+        entry = finished[lang_key]
+        video_path = entry["video_path"] if "video_path" in entry else manifest.encoded_path(entry)
+        upload_package = {**job.seo_metadata[lang_key], 'lang': lang_key, 'video_path': str(Path(video_path).resolve())}
+        if entry.get("upload_key"):
+            upload_package['upload_key'] = entry["upload_key"]
+        if manifest:
+            upload_package['manifest_path'] = str(manifest.path.resolve())
+        job.upload_packages.append(upload_package)
+
+    if len(finished) < len(all_langs):
+        failed = [lang_key for lang_key in all_langs if lang_key not in finished]
+        raise RuntimeError(f"Encoding failed for: {', '.join(failed)}")
+
+    signals.progress.emit(100)
+    return job
+
+def record_upload(upload_package, youtube_video_id):
+    """Uploader callback: marks the language as uploaded in the video's manifest."""
+    if upload_package.get('manifest_path'):
+        mark_uploaded(upload_package['manifest_path'], upload_package['lang'], youtube_video_id)
+
+def _stage_upload(job, ctx):
+    signals = ctx.signals
+    processed_count, total_time = ctx.job_done(job, True)
+    signals.processed_stats.emit(processed_count, total_time)
+
+    # --- TEK VİDEO SİNYALİ (Otomatik Yükleme İçin) ---
+    if job.upload_packages:
+        signals.video_finished.emit(job.upload_packages)
+
+    signals.log_message.emit(f"✅ Finished processing link: {job.link}")
+    signals.progress.emit(0) # Bir sonraki için barı sıfırla
+    return job
+
+
 def process_link(
     links_file_path, used_links_file_path, output_base_dir,
     openai_api_key, openai_model, yt_dlp_quality, ffmpeg_preset,
     signals: WorkerSignals, stop_event: threading.Event,
-    enable_overlay=True, hardware_accel="CPU", max_limit=0): # max_limit parametresi eklendi
-    
+    enable_overlay=True, hardware_accel="CPU", max_limit=0, settings=None, link_queue=None):
+
     if not openai_api_key:
         signals.log_message.emit("❌ OpenAI API key missing.")
         return False, "API Key missing", None, []
@@ -278,106 +1218,158 @@ def process_link(
         signals.log_message.emit(f"❌ OpenAI Error: {e}")
         return False, str(e), None, []
 
-    processed_count = 0
-    total_time = 0
-    
-    # --- ANA DÖNGÜ BAŞLIYOR ---
+    configure_llm_cache(settings)
+    configure_translator(settings)
+
+    ctx = ProcessingContext(client, output_base_dir, openai_model, yt_dlp_quality, ffmpeg_preset,
+                            signals, stop_event, enable_overlay, hardware_accel, settings)
+
+    ctx.probe_cache = PersistentCache("probe", max_bytes=8 * 1024 * 1024)
+
+    # Encode slotları: tüm dillerin ve videoların ffmpeg işleri aynı havuzu paylaşır
+    cores = os.cpu_count() or 1
+    utilization = cpu_utilization()
+    encoder_spec, encoder_note = get_encoder(get_processing_setting(settings, "encoder"), hardware_accel)
+    slots, threads = plan_slots(cores, utilization, get_processing_setting(settings, "encode_slots"),
+                                get_processing_setting(settings, "encode_threads"), encoder_spec.hardware,
+                                get_processing_setting(settings, "hardware_sessions"))
+    ctx.encode_farm = EncodeFarm(slots, threads, stop_event, on_status=signals.encode_status.emit)
+    load_text = f", {utilization:.0%} busy" if utilization is not None else ""
+    signals.log_message.emit(f"🧮 Encode slots: {slots} × {threads or 'auto'} thread(s) ({cores} cores{load_text}).")
+    if encoder_note:
+        signals.log_message.emit(f"⚠️ Encoder: {encoder_note}; using {encoder_spec.name}.")
+    rate_control = get_processing_setting(settings, "rate_control")
+    if not encoder_spec.supports(rate_control):
+        signals.log_message.emit(f"⚠️ {encoder_spec.name} does not support '{rate_control}' rate control; using bitrate.")
+    signals.log_message.emit(f"🎬 Encoder: {encoder_spec.label} | rate control: {rate_control if encoder_spec.supports(rate_control) else 'bitrate'}")
+
+    # İndirme -> AI -> Encode -> Yükleme aşamaları ayrı thread'lerde, aralarında sınırlı kuyruklarla çalışır
+    workers = get_processing_setting(settings, "pipeline_workers")
+    stages = [
+        Stage("download", lambda job: _stage_download(job, ctx), workers["download"]),
+        Stage("metadata", lambda job: _stage_metadata(job, ctx), workers["metadata"]),
+        # Birden fazla video aynı anda encode slotlarını doldurabilsin; sınır encode_slots ayarıdır
+        Stage("encode", lambda job: _stage_encode(job, ctx), slots),
+        Stage("upload", lambda job: _stage_upload(job, ctx), workers["upload"]),
+    ]
+
+    def on_error(stage_name, job, error, tb):
+        if stop_event.is_set():
+            # Stop'un öldürdüğü ffmpeg/indirme hatası denemeden sayılmaz; link 'claimed' kalır (on_drop gibi)
+            signals.log_message.emit(f"⏹️ Stopped {job.link} during {stage_name}.")
+            ctx.job_done(job, None, "stopped")
+            return
+        signals.log_message.emit(f"❌ Error on {job.link} ({stage_name}): {error}")
+        ctx.job_done(job, False, f"{stage_name}: {error}")
+
+    def on_drop(job):
+        # Stop ile yarıda kalan iş kuyrukta 'claimed' kalır, sonraki çalıştırmada tekrar denenir
+        ctx.job_done(job, None if stop_event.is_set() else False, "dropped")
+
+    pipeline = StagePipeline(stages, stop_event, get_processing_setting(settings, "pipeline_queue_size"),
+                             on_error=on_error, on_drop=on_drop)
+    pipeline.start()
+
+    # Link kuyruğu: ilk çalıştırmada link.txt/used_link.txt içe aktarılır, yarım kalan işler kuyruğa döner
+    own_queue = link_queue is None
+    if own_queue:
+        link_queue = LinkQueue(default_queue_path(links_file_path))
+    link_queue.sync_uploaded_log(UPLOADED_LOG_FILE)
+    link_queue.import_text_files(links_file_path, used_links_file_path)
+    link_queue.requeue_stale_claims()
+    ctx.link_queue, ctx.used_links_file_path = link_queue, used_links_file_path
+
+    preflight_rules = get_processing_setting(settings, "preflight")
+    if preflight_rules["enabled"]:
+        ctx.preflight = Preflight(preflight_rules, build_format_options(yt_dlp_quality, get_processing_setting(settings, "prefer_cheap_formats")))
+
+    prefetch_window = get_processing_setting(settings, "prefetch_window")
+    min_height = int(QUALITY_HEIGHTS.get(yt_dlp_quality, "1080"))
+    if prefetch_window > 0:
+        def prefetch_download(link, prefetch_signals, cancel_event):
+            result = ctx.preflight.peek(link, cancel_event) if ctx.preflight else None
+            return download_video_and_metadata(link, output_base_dir, yt_dlp_quality, prefetch_signals,
+                                               ctx.source_cache, result[2] if result else None, cancel_event,
+                                               get_processing_setting(settings, "download"),
+                                               get_processing_setting(settings, "prefer_cheap_formats"))
+        ctx.prefetcher = Prefetcher(
+            ctx.source_cache, prefetch_download, prefetch_window,
+            max_bytes=int(get_processing_setting(settings, "prefetch_max_gb") * 1024 ** 3),
+            min_free_bytes=int(get_processing_setting(settings, "prefetch_min_free_gb") * 1024 ** 3),
+            preflight=ctx.preflight, log=signals.log_message.emit, on_status=signals.prefetch_status.emit)
+
+    # --- ANA DÖNGÜ: linkleri boru hattına besle ---
+    admitted = 0
     while True:
         # 1. Durdurma ve Limit Kontrolü
         if stop_event.is_set():
             signals.log_message.emit("🛑 Processing stopped by user.")
             break
-            
+
+        with ctx.lock:
+            processed_count, in_flight = ctx.processed_count, ctx.in_flight
         if max_limit > 0 and processed_count >= max_limit:
             signals.log_message.emit(f"🛑 Limit reached ({max_limit} videos). Stopping.")
             break
+        if max_limit > 0 and processed_count + in_flight >= max_limit:
+            # Limit dolmak üzere; yoldaki videolardan biri başarısız olursa yerine yenisi alınır
+            stop_event.wait(0.5)
+            continue
 
-        # 2. Linkleri Oku
-        all_links = read_lines_from_file(links_file_path)
-        used_links = read_lines_from_file(used_links_file_path)
-        links_to_process = [link for link in all_links if link not in used_links]
+        # 2. Sıradaki linki kuyruktan al (link.txt değiştiyse önce yeni satırları ekle)
+        link_queue.sync_links_file(links_file_path)
+        link_to_process = link_queue.claim_next()
 
-        if not links_to_process:
+        if not link_to_process:
+            if in_flight > 0:
+                # Yoldaki işlerden biri başarısız olursa kuyruğa geri döner; onları bekle
+                stop_event.wait(0.5)
+                continue
             signals.log_message.emit("ℹ️ No more links to process.")
             break
 
-        link_to_process = links_to_process[0]
-        video_id = None
-        
-        try:
-            start_time = time.time()
-            signals.log_message.emit(f"▶️ [{processed_count + 1}] Processing: {link_to_process}")
-            
-            # Linki 'kullanıldı' işaretle (Hata olsa bile tekrar denememek için başta işaretliyoruz, istersen sona alabilirsin)
-            append_line_to_file(used_links_file_path, link_to_process)
-            
-            # Kalan link sayısını güncelle
-            signals.remaining_links_count.emit(len(links_to_process) - 1)
-            signals.progress.emit(10)
-
-            # 3. İndirme İşlemi
-            video_info = download_video_and_metadata(link_to_process, output_base_dir, yt_dlp_quality, signals)
-            if not video_info or 'downloaded_filepath' not in video_info:
-                raise ValueError("Download failed.")
-            
-            video_id = video_info.get('id')
-            original_video_path = Path(video_info['downloaded_filepath'])
-            signals.progress.emit(30)
-            
-            if stop_event.is_set(): break
-
-            # 4. AI ve İşleme
-            translated_sentence = ""
-            if enable_overlay:
-                signals.log_message.emit("⏳ Generating motivation...")
-                base_motivation_sentence = generate_motivational_sentence(client, openai_model)
-                signals.log_message.emit(f"✅ Quote: '{base_motivation_sentence}'")
-            
-            current_batch_metadata = [] # Bu videoya ait tüm dillerin çıktısı
-
-            for i, lang_key in enumerate(ENABLED_LANGUAGES):
-                if stop_event.is_set(): break
-                
-                # SEO
-                seo_metadata = generate_seo_metadata(client, openai_model, video_info, lang_key, signals)
-                if not seo_metadata: continue
-                save_seo_metadata(video_id, seo_metadata, lang_key, output_base_dir, signals)
-
-                # Çeviri ve Overlay
-                if enable_overlay:
-                    translated_sentence = translate_text(base_motivation_sentence, LANG_CODE_MAP[lang_key], signals)
-                
-                lang_output_dir = output_base_dir / video_id / lang_key
-                output_video_path = lang_output_dir / f"{lang_key}.mp4"
-                
-                overlay_success = add_text_overlay_to_video(
-                    original_video_path, output_video_path, translated_sentence,
-                    ffmpeg_preset, signals, enable_overlay, hardware_accel
-                )
-                
-                if overlay_success:
-                    upload_package = {**seo_metadata, 'lang': lang_key, 'video_path': str(output_video_path.resolve())}
-                    current_batch_metadata.append(upload_package)
-                
-                # Progress barı her dil için biraz ilerlet
-                signals.progress.emit(40 + int((i + 1) / len(ENABLED_LANGUAGES) * 60))
-
-            # 5. Video Bitti, İstatistikleri Güncelle
-            time_taken = int(time.time() - start_time)
-            processed_count += 1
-            total_time += time_taken
-            signals.processed_stats.emit(processed_count, total_time)
-            
-            # --- TEK VİDEO SİNYALİ (Otomatik Yükleme İçin) ---
-            if current_batch_metadata:
-                signals.video_finished.emit(current_batch_metadata)
-            
-            signals.log_message.emit(f"✅ Finished processing link: {link_to_process}")
-            signals.progress.emit(0) # Bir sonraki için barı sıfırla
+        signals.remaining_links_count.emit(link_queue.remaining_count())
+        if ctx.prefetcher:
+            ctx.prefetcher.update(link_queue.peek(prefetch_window), min_height)
 
-        except Exception as e:
-            signals.log_message.emit(f"❌ Error on {link_to_process}: {e}")
-            # Hata olsa bile döngü devam eder, bir sonraki linke geçer.
+        if ctx.preflight:
+            # Sıradaki linkler arka planda kontrol edilirken bu linkin sonucunu bekle
+            ctx.preflight.prefetch(link_queue.peek(preflight_rules["batch_size"]))
+            result = ctx.preflight.verdict(link_to_process, stop_event)
+            if result is None:
+                continue
+            verdict, reason = result
+            if verdict == REJECT:
+                signals.log_message.emit(f"⏭️ Skipped before download: {link_to_process} ({reason})")
+                link_queue.fail(link_to_process, f"preflight: {reason}")
+                append_line_to_file(used_links_file_path, link_to_process)
+                signals.remaining_links_count.emit(link_queue.remaining_count())
+                continue
+            if verdict == DEFER:
+                signals.log_message.emit(f"⏸️ Deferred: {link_to_process} ({reason})")
+                link_queue.defer(link_to_process, f"preflight: {reason}", preflight_rules["defer_seconds"])
+                continue
+
+        admitted += 1
+        with ctx.lock:
+            ctx.in_flight += 1
+        job = VideoJob(link_to_process, admitted)
+        if not pipeline.put(job):
+            ctx.job_done(job, None)
             continue
-            
-    return True, "Batch processing completed.", None, []
\ No newline at end of file
+
+    pipeline.close()
+    pipeline.join()
+    ctx.encode_farm.shutdown()
+    ctx.probe_cache.close()
+    signals.log_message.emit(f"ℹ️ {ctx.source_cache.stats_line()}")
+    signals.log_message.emit(f"ℹ️ {ctx.transcodes_skipped} video(s) skipped transcoding (stream copy).")
+    if ctx.prefetcher:
+        ctx.prefetcher.shutdown()
+    if ctx.preflight:
+        signals.log_message.emit(f"ℹ️ {ctx.preflight.stats_line()}")
+        ctx.preflight.shutdown()
+    if own_queue:
+        link_queue.close()
+
+    return True, "Batch processing completed.", None, []
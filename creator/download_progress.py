@@ -0,0 +1,172 @@
+# Automation/creator/download_progress.py
+# yt-dlp progress hook adapter: turns downloaded_bytes / total_bytes / speed
+# into rate-limited progress-bar updates and log lines, and aborts a
+# download whose throughput has dropped to zero so it can be retried.
+# yt-dlp only calls the hook when data arrives, so run_watched also polls
+# from outside and catches connections that hang without sending anything.
+
+import threading
+import time
+from pathlib import Path
+
+
+class DownloadStalled(Exception):
+    pass
+
+
+class DownloadCancelled(Exception):
+    pass
+
+
+def _mb(n):
+    return f"{(n or 0) / 1024 ** 2:.1f} MB"
+
+def _dir_bytes(path):
+    # Harici indirici (aria2c) kancayı nadiren çağırır: ilerleme diskteki .part dosyalarından da okunur
+    try:
+        return sum(f.stat().st_size for f in Path(path).iterdir() if f.is_file())
+    except OSError:
+        return 0
+
+
+class DownloadProgress:
+    def __init__(self, signals, bar_start=10, bar_end=30, stop_event=None, stall_timeout=30,
+                 min_interval=0.25, log_interval=5.0, clock=time.monotonic, watch_dir=None):
+        self.signals = signals
+        self.bar_start = bar_start
+        self.bar_end = bar_end
+        self.stop_event = stop_event
+        self.stall_timeout = stall_timeout
+        self.min_interval = min_interval
+        self.log_interval = log_interval
+        self.clock = clock
+        self.watch_dir = watch_dir
+        self.stalled = False
+        self.postprocessing = False
+        self.cancelled = False
+        self.bytes = 0
+        self._parts = {}          # dosya adı -> (indirilen, toplam)
+        self._expected_total = 0
+        self._last_bytes = 0
+        self._last_disk = 0
+        self._last_advance = clock()
+        self._last_emit = 0.0
+        self._last_log = clock()
+        self._last_percent = None
+
+    # yt-dlp her veri bloğunda (ve bitişte) bu kancayı çağırır
+    def hook(self, d):
+        self._check_abort()
+
+        now = self.clock()
+        filename = d.get('filename') or d.get('tmpfilename') or ""
+        if not self._expected_total:
+            # Video + ses ayrı dosyalar halinde iner: toplamı istenen formatlardan tahmin et
+            formats = (d.get('info_dict') or {}).get('requested_formats') or []
+            self._expected_total = sum(f.get('filesize') or f.get('filesize_approx') or 0 for f in formats)
+
+        if d.get('status') == 'finished':
+            done = d.get('downloaded_bytes') or d.get('total_bytes') or self._parts.get(filename, (0, 0))[0]
+            self._parts[filename] = (done, done)
+        elif d.get('status') == 'downloading':
+            total = d.get('total_bytes') or d.get('total_bytes_estimate') or 0
+            self._parts[filename] = (d.get('downloaded_bytes') or 0, total)
+        self.bytes = sum(done for done, _ in self._parts.values())
+
+        if self.bytes > self._last_bytes:
+            self._last_bytes = self.bytes
+            self._last_advance = now
+        elif d.get('status') == 'downloading' and now - self._last_advance > self.stall_timeout:
+            self.stalled = True
+            raise DownloadStalled(self._stall_message())
+
+        if d.get('status') == 'finished' or now - self._last_emit >= self.min_interval:
+            self._last_emit = now
+            self._emit_progress()
+        if d.get('status') == 'downloading' and now - self._last_log >= self.log_interval:
+            self._last_log = now
+            self._log(d)
+
+    def _check_abort(self):
+        if self.stop_event is not None and self.stop_event.is_set():
+            self.cancelled = True
+            raise DownloadCancelled("Download cancelled.")
+        if self.stalled:
+            # Watchdog bu denemeden vazgeçti: geride kalan indirme ilk fırsatta durur
+            raise DownloadStalled(self._stall_message())
+
+    def _stall_message(self):
+        return f"No data for {self.stall_timeout:.0f}s at {_mb(self.bytes)}"
+
+    def postprocessor_hook(self, d):
+        # Birleştirme (merge) sırasında veri gelmez; takılma sayılmaz
+        self.postprocessing = True
+
+    def retry_sleep(self, n):
+        # yt-dlp kendi yeniden denemesinden önce çağırır (retry_sleep_functions); bekleme eklemez
+        self._check_abort()
+        return 0
+
+    def check_stall(self):
+        """Called by the watchdog: True (and stalled is set) once stall_timeout passed without new bytes."""
+        now = self.clock()
+        if self.watch_dir is not None:
+            on_disk = _dir_bytes(self.watch_dir)
+            if on_disk > self._last_disk:
+                self._last_disk = on_disk
+                self._last_advance = now
+        if self.postprocessing or now - self._last_advance <= self.stall_timeout:
+            return False
+        self.stalled = True
+        return True
+
+    def fraction(self):
+        total = max(self._expected_total, sum(total for _, total in self._parts.values()))
+        return min(1.0, self.bytes / total) if total else 0.0
+
+    def _emit_progress(self):
+        percent = self.bar_start + int(self.fraction() * (self.bar_end - self.bar_start))
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.signals.progress.emit(percent)
+
+    def _log(self, d):
+        speed = d.get('speed')
+        eta = d.get('eta')
+        parts = [f"⬇️ {self.fraction():.0%} of {_mb(self._expected_total or d.get('total_bytes') or d.get('total_bytes_estimate'))}"]
+        parts.append(f"{_mb(speed)}/s" if speed else "-- MB/s")
+        if eta is not None: parts.append(f"ETA {int(eta)}s")
+        self.signals.log_message.emit(" | ".join(parts))
+
+
+def run_watched(func, progress, poll_interval=1.0, grace=30):
+    """
+    Runs func() (the yt-dlp download) on a helper thread and polls progress
+    every poll_interval seconds. Raises DownloadStalled once stall_timeout
+    passes without new bytes, even if yt-dlp is stuck in a read and never
+    calls the hook, and DownloadCancelled when Stop is pressed. The abandoned
+    attempt aborts at its next hook call or retry; it gets up to grace
+    seconds to exit so it does not write into the .part file of the retry.
+    """
+    result = {}
+    def target():
+        try:
+            result["value"] = func()
+        except BaseException as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, name="download", daemon=True)
+    thread.start()
+    while True:
+        thread.join(poll_interval)
+        if not thread.is_alive():
+            break
+        if progress.stop_event is not None and progress.stop_event.is_set():
+            progress.cancelled = True
+            raise DownloadCancelled("Download cancelled.")
+        if progress.check_stall():
+            thread.join(grace)
+            raise DownloadStalled(progress._stall_message())
+    if "error" in result:
+        raise result["error"]
+    return result.get("value")
@@ -0,0 +1,145 @@
+# Automation/creator/encode_farm.py
+# Shared pool of encode slots. Every ffmpeg encode (any language, any video)
+# runs in one of N slots; N and the -threads value given to each ffmpeg are
+# derived from the core count and the CPU load measured at start, so
+# parallel encodes fill the machine without oversubscribing it. Running
+# ffmpeg processes are registered here and terminated when Stop is pressed.
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# libx264 1440p'de ~8 thread'e kadar iyi ölçeklenir; fazlası tek işte boşa gider
+TARGET_THREADS_PER_JOB = 8
+# Tüketici GPU'ları aynı anda sınırlı sayıda encode oturumu açabilir
+HARDWARE_SLOTS = 2
+# Tüm slotlardaki donanım encode oturumlarının toplamı (çok çıktılı komut çıktı başına bir oturum açar)
+HARDWARE_SESSIONS = 4
+
+
+def cpu_utilization():
+    """Fraction of the CPU that is busy right now (0..1), or None if it cannot be measured."""
+    if psutil is not None:
+        return psutil.cpu_percent(interval=0.5) / 100
+    if hasattr(os, "getloadavg"):
+        return min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+    return None
+
+def plan_slots(cores, utilization=None, slots=0, threads=0, hardware=False, sessions=HARDWARE_SESSIONS):
+    """
+    (slots, threads per ffmpeg). Non-zero slots/threads are taken as given;
+    otherwise they are sized from the idle cores. threads=0 for hardware
+    encoders leaves the choice to ffmpeg; their slots never exceed the
+    session budget.
+    """
+    idle = max(1, round(cores * (1 - (utilization or 0))))
+    if hardware:
+        return min(slots or HARDWARE_SLOTS, sessions or HARDWARE_SESSIONS), threads
+    if not slots:
+        per_job = threads or TARGET_THREADS_PER_JOB
+        slots = max(1, idle // per_job)
+    if not threads:
+        threads = max(1, idle // slots)
+    return slots, threads
+
+def outputs_per_command(outputs, slots, hardware=False, sessions=HARDWARE_SESSIONS):
+    """
+    How many outputs one multi-output ffmpeg command may write. Hardware
+    encoders open one session per output, so slots x outputs per command
+    stays within the session budget.
+    """
+    if not hardware:
+        return outputs
+    return max(1, min(outputs, (sessions or HARDWARE_SESSIONS) // max(1, slots)))
+
+
+class EncodeFarm:
+    def __init__(self, slots=1, threads=0, stop_event=None, on_status=None):
+        self.slots = max(1, slots)
+        self.threads = threads
+        self.stop_event = stop_event
+        self.on_status = on_status
+        self._executor = ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix="encode")
+        self._queued = 0
+        self._busy = 0
+        self._processes = set()
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        if stop_event is not None:
+            threading.Thread(target=self._watch_stop, name="encode-stop", daemon=True).start()
+
+    @property
+    def stopped(self):
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    # --- Durum ---
+    def status(self):
+        """(jobs waiting for a slot, busy slots, total slots)."""
+        with self._lock:
+            return self._queued, self._busy, self.slots
+
+    def _emit_status(self):
+        if self.on_status: self.on_status(*self.status())
+
+    # --- İş kuyruğu ---
+    def submit(self, func, *args, **kwargs):
+        """Queues func for the next free slot; returns a Future. Jobs still queued after Stop return False."""
+        with self._lock:
+            self._queued += 1
+        self._emit_status()
+        return self._executor.submit(self._run, func, args, kwargs)
+
+    def run(self, func, *args, **kwargs):
+        return self.submit(func, *args, **kwargs).result()
+
+    def _run(self, func, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._busy += 1
+        self._emit_status()
+        try:
+            if self.stopped:
+                return False
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._busy -= 1
+            self._emit_status()
+
+    # --- Alt süreçler (run_with_progress kaydeder) ---
+    def add(self, process):
+        with self._lock:
+            self._processes.add(process)
+        if self.stopped:
+            process.terminate()
+
+    def discard(self, process):
+        with self._lock:
+            self._processes.discard(process)
+
+    def terminate_all(self):
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            try:
+                process.terminate()
+            except OSError:
+                pass
+
+    def _watch_stop(self):
+        while not self._closed.wait(0.2):
+            if self.stop_event.is_set():
+                self.terminate_all()
+                return
+
+    def shutdown(self):
+        self._closed.set()
+        if self.stopped:
+            self.terminate_all()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        if self.on_status: self.on_status(0, 0, self.slots)
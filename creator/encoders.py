@@ -0,0 +1,127 @@
+# Automation/creator/encoders.py
+# Encoder registry: for every supported video encoder, how x264-style preset
+# names map to its own presets and which ffmpeg arguments implement each
+# rate-control mode (average bitrate, CRF, capped CRF, 2-pass). Available
+# encoders are read once from "ffmpeg -encoders"; calibration results from
+# "python -m creator.benchmark encoders" are stored next to the caches.
+
+import json
+import re
+import subprocess
+from functools import lru_cache
+from pathlib import Path
+
+CALIBRATION_PATH = Path(__file__).parent / "cache" / "encoder_calibration.json"
+
+RATE_MODES = ("bitrate", "crf", "capped_crf", "2pass")
+
+# Arayüzdeki "Hardware" seçimi -> varsayılan encoder (encoder="auto" iken)
+HARDWARE_ENCODERS = {"CPU": "libx264", "NVIDIA (NVENC)": "h264_nvenc", "AMD (AMF)": "h264_amf"}
+
+X264_PRESETS = ["ultrafast", "superfast", "veryfast", "faster", "fast", "medium", "slow", "slower", "veryslow"]
+
+
+class EncoderSpec:
+    def __init__(self, name, label, presets=None, default_crf=23, crf_args=None, capped_crf=True,
+                 two_pass=False, extra_args=(), hardware=False):
+        self.name = name
+        self.label = label
+        self.presets = presets or {}     # x264 preset adı -> encoder preset'i (boşsa aynen geçer)
+        self.default_crf = default_crf
+        self.crf_args = crf_args or (lambda crf: ['-crf', str(crf)])
+        self.capped_crf = capped_crf
+        self.two_pass = two_pass
+        self.extra_args = list(extra_args)
+        self.hardware = hardware
+
+    def preset_for(self, ffmpeg_preset):
+        return self.presets.get(ffmpeg_preset, ffmpeg_preset) if self.presets else ffmpeg_preset
+
+    def supports(self, rate_control):
+        if rate_control == "2pass":
+            return self.two_pass
+        if rate_control == "capped_crf":
+            return self.capped_crf
+        return rate_control in RATE_MODES
+
+    def rate_args(self, profile, rate_control="bitrate", crf=None):
+        """Rate-control arguments for profile (an OutputProfile); unsupported modes fall back to bitrate."""
+        crf = self.default_crf if crf is None else crf
+        bitrate = ['-b:v', f'{profile.bitrate_k}k']
+        cap = ['-maxrate', f'{profile.maxrate_k}k', '-bufsize', f'{profile.bufsize_k}k']
+        if not self.supports(rate_control):
+            rate_control = "bitrate"
+        if rate_control == "crf":
+            return self.crf_args(crf)
+        if rate_control == "capped_crf":
+            return self.crf_args(crf) + cap
+        return bitrate + cap
+
+
+def _nvenc_cq(crf):
+    return ['-rc', 'vbr', '-cq', str(crf), '-b:v', '0']
+
+def _amf_qp(crf):
+    return ['-rc', 'cqp', '-qp_i', str(crf), '-qp_p', str(crf)]
+
+# NVIDIA 'veryslow' anlamaz: P1 (en hızlı) - P7 (en kaliteli)
+_NVENC_PRESETS = {"ultrafast": "p1", "superfast": "p1", "veryfast": "p3", "faster": "p3", "fast": "p5",
+                  "medium": "p5", "slow": "p7", "slower": "p7", "veryslow": "p7"}
+_AMF_PRESETS = {name: ("speed" if "fast" in name else "quality" if "slow" in name else "balanced") for name in X264_PRESETS}
+# SVT-AV1: 0 (en yavaş) - 13 (en hızlı)
+_SVT_PRESETS = dict(zip(X264_PRESETS, ["12", "11", "10", "9", "8", "7", "6", "5", "4"]))
+
+ENCODERS = {spec.name: spec for spec in [
+    EncoderSpec("libx264", "H.264 (x264)", default_crf=20, two_pass=True),
+    EncoderSpec("libx265", "HEVC (x265)", default_crf=24, extra_args=['-tag:v', 'hvc1']),
+    EncoderSpec("libsvtav1", "AV1 (SVT-AV1)", presets=_SVT_PRESETS, default_crf=32),
+    EncoderSpec("h264_nvenc", "H.264 (NVENC)", presets=_NVENC_PRESETS, default_crf=23, crf_args=_nvenc_cq, hardware=True),
+    EncoderSpec("hevc_nvenc", "HEVC (NVENC)", presets=_NVENC_PRESETS, default_crf=25, crf_args=_nvenc_cq,
+                extra_args=['-tag:v', 'hvc1'], hardware=True),
+    EncoderSpec("h264_amf", "H.264 (AMF)", presets=_AMF_PRESETS, default_crf=22, crf_args=_amf_qp, capped_crf=False, hardware=True),
+]}
+
+
+@lru_cache(maxsize=1)
+def available_encoders():
+    """Names of the video encoders this ffmpeg build has, or None if ffmpeg cannot be run."""
+    try:
+        output = subprocess.run(['ffmpeg', '-hide_banner', '-encoders'], check=True, capture_output=True, text=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return frozenset(re.findall(r"^\s*V\S{5}\s+(\S+)", output, re.MULTILINE))
+
+def registered_encoders():
+    """Registry entries available in this ffmpeg build (all of them if it cannot be checked)."""
+    available = available_encoders()
+    return [spec for spec in ENCODERS.values() if available is None or spec.name in available]
+
+def get_encoder(name="auto", hardware_accel="CPU"):
+    """
+    (EncoderSpec, note). name="auto" follows the hardware selection; an
+    encoder that is unknown or missing from this ffmpeg build falls back to
+    libx264 and note says why.
+    """
+    if not name or name == "auto":
+        name = HARDWARE_ENCODERS.get(hardware_accel, "libx264")
+    spec = ENCODERS.get(name)
+    if spec is None:
+        return ENCODERS["libx264"], f"unknown encoder '{name}'"
+    available = available_encoders()
+    if available is not None and name not in available:
+        return ENCODERS["libx264"], f"'{name}' is not available in this ffmpeg build"
+    return spec, ""
+
+
+def load_calibration(path=CALIBRATION_PATH):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_calibration(results, path=CALIBRATION_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
@@ -0,0 +1,155 @@
+# Automation/creator/ffmpeg_progress.py
+# Runs ffmpeg with "-progress pipe:1" and reads the key=value blocks it
+# writes while encoding: frame, fps, out_time and speed become rate-limited
+# progress-bar updates and log lines. stderr is drained on a separate thread
+# into a bounded ring buffer, so only its tail is kept for error reporting.
+
+import collections
+import subprocess
+import threading
+import time
+
+STDERR_TAIL_LINES = 200
+
+
+class FFmpegError(Exception):
+    def __init__(self, returncode, stderr_tail):
+        super().__init__(f"ffmpeg exited with code {returncode}")
+        self.returncode = returncode
+        self.stderr_tail = stderr_tail
+
+
+def _parse_time_us(value):
+    try:
+        return max(0, int(value)) / 1_000_000
+    except (TypeError, ValueError):
+        return None
+
+
+class EncodeProgress:
+    def __init__(self, signals, duration=None, bar_start=40, bar_end=100, min_interval=0.5,
+                 log_interval=10.0, clock=time.monotonic):
+        self.signals = signals
+        self.duration = duration or 0
+        self.bar_start = bar_start
+        self.bar_end = bar_end
+        self.min_interval = min_interval
+        self.log_interval = log_interval
+        self.clock = clock
+        self.started = clock()
+        self.frame = 0
+        self.fps = 0.0
+        self.speed = 0.0
+        self.out_time = 0.0
+        self.finished = False
+        self._block = {}
+        self._last_emit = 0.0
+        self._last_log = self.started
+        self._last_percent = None
+
+    # ffmpeg her blokta key=value satırları yazar; blok "progress=..." ile biter
+    def feed_line(self, line):
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return
+        if key != "progress":
+            self._block[key] = value.strip()
+            return
+        self._apply(self._block)
+        self._block = {}
+        now = self.clock()
+        self.finished = value.strip() == "end"
+        if self.finished or now - self._last_emit >= self.min_interval:
+            self._last_emit = now
+            self._emit_progress()
+        if not self.finished and now - self._last_log >= self.log_interval:
+            self._last_log = now
+            self.signals.log_message.emit(self.describe())
+
+    def _apply(self, block):
+        try:
+            self.frame = int(block.get("frame", self.frame))
+        except ValueError:
+            pass
+        try:
+            self.fps = float(block.get("fps", self.fps))
+        except ValueError:
+            pass
+        speed = block.get("speed", "").rstrip("x")
+        try:
+            self.speed = float(speed)
+        except ValueError:
+            pass
+        out_time = _parse_time_us(block.get("out_time_us") or block.get("out_time_ms"))
+        if out_time is not None:
+            self.out_time = out_time
+
+    def fraction(self):
+        if self.finished:
+            return 1.0
+        return min(1.0, self.out_time / self.duration) if self.duration else 0.0
+
+    def eta(self):
+        if not self.duration or self.speed <= 0:
+            return None
+        return max(0.0, (self.duration - self.out_time) / self.speed)
+
+    def _emit_progress(self):
+        if self.bar_end <= self.bar_start:
+            return
+        percent = self.bar_start + int(self.fraction() * (self.bar_end - self.bar_start))
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.signals.progress.emit(percent)
+
+    def describe(self):
+        parts = [f"🎞️ {self.fraction():.0%} | frame {self.frame}", f"{self.fps:.1f} fps", f"{self.speed:.2f}x"]
+        eta = self.eta()
+        if eta is not None: parts.append(f"ETA {int(eta)}s")
+        return " | ".join(parts)
+
+    def stats(self):
+        """Frames, wall time and average fps of the whole encode."""
+        seconds = self.clock() - self.started
+        return {"frames": self.frame, "seconds": round(seconds, 2),
+                "fps": round(self.frame / seconds, 2) if seconds > 0 else 0.0, "speed": self.speed}
+
+
+def _drain(stream, tail):
+    for line in stream:
+        tail.append(line.rstrip())
+
+
+def run_with_progress(ffmpeg_cmd, progress=None, stop_event=None, tail_lines=STDERR_TAIL_LINES, registry=None):
+    """
+    Runs ffmpeg_cmd, feeding its -progress output to progress (an
+    EncodeProgress). Raises FFmpegError with the last tail_lines of stderr if
+    ffmpeg fails; the process is terminated if stop_event is set. registry
+    (e.g. an EncodeFarm) is told about the process via add()/discard().
+    """
+    cmd = [ffmpeg_cmd[0], '-nostats', '-progress', 'pipe:1'] + list(ffmpeg_cmd[1:])
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, stdin=subprocess.DEVNULL,
+                               text=True, encoding='utf-8', errors='replace')
+    if registry is not None:
+        registry.add(process)
+    tail = collections.deque(maxlen=tail_lines)
+    stderr_thread = threading.Thread(target=_drain, args=(process.stderr, tail), daemon=True)
+    stderr_thread.start()
+    try:
+        for line in process.stdout:
+            if stop_event is not None and stop_event.is_set():
+                process.terminate()
+                break
+            if progress is not None:
+                progress.feed_line(line)
+        returncode = process.wait()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        stderr_thread.join(timeout=5)
+        if registry is not None:
+            registry.discard(process)
+    if returncode != 0:
+        raise FFmpegError(returncode, "\n".join(tail))
+    return progress.stats() if progress is not None else None
@@ -0,0 +1,75 @@
+# Automation/creator/layout.py
+# Text layout for the caption overlay: picks the largest font size whose
+# wrapped lines fit the box. Fonts, wrap patterns and finished layouts are
+# cached, so repeated captions (same quote, every language, every video) cost
+# nothing after the first call.
+
+import re
+from collections import namedtuple
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import ImageFont
+
+DEFAULT_FONT_PATH = Path(__file__).parent / "Oswald-Regular.ttf"
+
+TextLayout = namedtuple("TextLayout", ["lines", "font_size", "text_width", "fits"])
+
+
+@lru_cache(maxsize=128)
+def get_font(font_path, size):
+    return ImageFont.truetype(str(font_path), size)
+
+@lru_cache(maxsize=64)
+def _wrap_pattern(max_chars_per_line):
+    return re.compile(f'.{{1,{max_chars_per_line}}}(?=\\s|$)')
+
+def wrap_text(text, font, max_width):
+    """Splits text into lines of at most max_width / width('x') characters, breaking at whitespace."""
+    avg_char_width = font.getlength("x")
+    max_chars_per_line = int(max_width / avg_char_width) if avg_char_width > 0 else 20
+    return _wrap_pattern(max(1, max_chars_per_line)).findall(text)
+
+def _measure(text, font_path, size, max_width):
+    font = get_font(font_path, size)
+    lines = wrap_text(text, font, max_width)
+    text_w = max(map(font.getlength, lines)) if lines else 0
+    return lines, text_w
+
+@lru_cache(maxsize=1024)
+def fit_text(text, max_width, min_size, max_size, font_path=DEFAULT_FONT_PATH):
+    """
+    Returns the TextLayout with the largest font size in [min_size, max_size]
+    whose widest line fits max_width. Short captions usually fit at
+    max_size, so that is tried first; otherwise binary search. If even
+    min_size overflows, the min_size layout is returned with fits=False.
+    """
+    lines, text_w = _measure(text, font_path, max_size, max_width)
+    if text_w <= max_width:
+        return TextLayout(tuple(lines), max_size, text_w, True)
+
+    low, high = min_size, max_size - 1
+    best = None
+    while low <= high:
+        size = (low + high) // 2
+        lines, text_w = _measure(text, font_path, size, max_width)
+        if text_w <= max_width:
+            best = TextLayout(tuple(lines), size, text_w, True)
+            low = size + 1
+        else:
+            high = size - 1
+
+    if best is None:
+        lines, text_w = _measure(text, font_path, min_size, max_width)
+        best = TextLayout(tuple(lines), min_size, text_w, False)
+    return best
+
+def fit_caption(text, frame_width, frame_height, font_path=DEFAULT_FONT_PATH):
+    """Caption box rules used by the encoder: 90% of the frame width, font between h/50 and h/25."""
+    return fit_text(text, int(frame_width * 0.9), int(frame_height / 50), int(frame_height / 25), font_path)
+
+def cache_info():
+    return {"layouts": fit_text.cache_info(), "fonts": get_font.cache_info()}
+
+def clear_caches():
+    fit_text.cache_clear(); get_font.cache_clear(); _wrap_pattern.cache_clear()
@@ -0,0 +1,462 @@
+# Automation/creator/link_queue.py
+# Persistent link queue on SQLite. Replaces rescanning link.txt/used_link.txt
+# on every video: dedupe is a primary-key lookup, and claim/complete/fail are
+# single transactions, so a crash never leaves a half-written state.
+# link.txt stays the place where users add links (it is synced in), and
+# used_link.txt is still written for compatibility.
+#
+# Usage (from the project root):
+#   python -m creator.link_queue import --links creator/link.txt --used creator/used_link.txt
+#   python -m creator.link_queue export --links creator/link.txt --used creator/used_link.txt
+#   python -m creator.link_queue count --links creator/link.txt
+#   python -m creator.link_queue dedupe --links creator/link.txt
+
+import argparse
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+QUEUED, CLAIMED, DONE, FAILED = "queued", "claimed", "done", "failed"
+
+
+_VIDEO_ID_RE = re.compile(r"(?:v=|\/|be\/)([a-zA-Z0-9_-]{11})(?:[&?#/]|$)")
+_UPLOADED_PATH_RE = re.compile(r"[\\/]([a-zA-Z0-9_-]{11})[\\/](?:[a-z]{2}[\\/][a-z]{2}|master[^\\/]*)\.mp4$")
+
+def get_video_id(youtube_url):
+    match = _VIDEO_ID_RE.search(youtube_url)
+    return match.group(1) if match else None
+
+def canonical_url(youtube_url):
+    """youtu.be/X, watch?v=X&t=3 and shorts/X all become https://www.youtube.com/shorts/X."""
+    video_id = get_video_id(youtube_url)
+    return f"https://www.youtube.com/shorts/{video_id}" if video_id else youtube_url.strip()
+
+def video_id_from_output_path(video_path):
+    """Video ID from an uploaded file path (<output>/<video_id>/<lang>/<lang>.mp4 or <video_id>/master*.mp4)."""
+    match = _UPLOADED_PATH_RE.search(video_path.strip())
+    return match.group(1) if match else None
+
+def default_queue_path(links_file_path):
+    return Path(links_file_path).with_name("link_queue.sqlite")
+
+def _read_lines(filepath):
+    if not Path(filepath).exists(): return []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+class LinkQueue:
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._links_file_watch = None
+        self.check_interval = 1.0  # link.txt en fazla saniyede bir kontrol edilir
+        self._conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS links ("
+                " key TEXT PRIMARY KEY, link TEXT NOT NULL, status TEXT NOT NULL,"
+                " position INTEGER NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+                " added REAL NOT NULL, updated REAL NOT NULL, error TEXT,"
+                " not_before REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(links)")}
+            if "not_before" not in columns:
+                # Ertelenen linkler için sütun (eski veritabanları)
+                self._conn.execute("ALTER TABLE links ADD COLUMN not_before REAL NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_links_status ON links (status, position)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS uploaded_ids (video_id TEXT PRIMARY KEY)")
+            self._create_counters()
+            self._migrate_keys()
+            self._reload_counts()
+
+    # --- Sayaçlar ---
+    def _create_counters(self):
+        # Durum başına sayaç tablosu tetikleyicilerle aynı transaction içinde güncellenir;
+        # sayım için tabloyu taramaya gerek kalmaz (CLI dahil)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS status_counts (status TEXT PRIMARY KEY, n INTEGER NOT NULL);
+            CREATE TRIGGER IF NOT EXISTS links_count_ins AFTER INSERT ON links BEGIN
+                INSERT OR IGNORE INTO status_counts VALUES (NEW.status, 0);
+                UPDATE status_counts SET n = n + 1 WHERE status = NEW.status;
+            END;
+            CREATE TRIGGER IF NOT EXISTS links_count_del AFTER DELETE ON links BEGIN
+                UPDATE status_counts SET n = n - 1 WHERE status = OLD.status;
+            END;
+            CREATE TRIGGER IF NOT EXISTS links_count_upd AFTER UPDATE OF status ON links
+            WHEN OLD.status <> NEW.status BEGIN
+                UPDATE status_counts SET n = n - 1 WHERE status = OLD.status;
+                INSERT OR IGNORE INTO status_counts VALUES (NEW.status, 0);
+                UPDATE status_counts SET n = n + 1 WHERE status = NEW.status;
+            END;
+        """)
+        if self._get_meta("status_counts_ready") is None:
+            # Sayaç tablosundan önce oluşturulmuş veritabanı: bir kez say
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM status_counts")
+            self._conn.execute("INSERT INTO status_counts SELECT status, COUNT(*) FROM links GROUP BY status")
+            self._set_meta("status_counts_ready", 1)
+            self._conn.execute("COMMIT")
+
+    def _reload_counts(self):
+        counts = {QUEUED: 0, CLAIMED: 0, DONE: 0, FAILED: 0}
+        counts.update(dict(self._conn.execute("SELECT status, n FROM status_counts").fetchall()))
+        self._counts = counts
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    # --- Yardımcılar ---
+    def _transaction(self):
+        return _Transaction(self._conn, self._lock, self._reload_counts)
+
+    @staticmethod
+    def key_for(link):
+        # Aynı videonun farklı URL biçimleri tek anahtar: 11 karakterlik video ID
+        return get_video_id(link) or link.strip()
+
+    def _migrate_keys(self):
+        # Eski veritabanları ham URL ile anahtarlanmıştı: video ID'ye çevir, kopyalarda en ilerideki durumu tut
+        if self._get_meta("key_scheme") == "video_id":
+            return
+        rank = {DONE: 3, FAILED: 2, CLAIMED: 1, QUEUED: 0}
+        self._conn.execute("BEGIN IMMEDIATE")
+        rows = self._conn.execute("SELECT key, link, status, position, attempts, added, updated, error FROM links ORDER BY position").fetchall()
+        merged = {}
+        for _, link, status, position, attempts, added, updated, error in rows:
+            key = self.key_for(link)
+            first = merged.get(key)
+            if first is None:
+                merged[key] = (key, canonical_url(link), status, position, attempts, added, updated, error)
+            elif rank.get(status, 0) > rank.get(first[2], 0):
+                # İlk görülen sıra korunur, durum daha ileride olan kopyadan alınır
+                merged[key] = first[:2] + (status, first[3], attempts, first[5], updated, error)
+        self._conn.execute("DELETE FROM links")
+        self._conn.executemany("INSERT INTO links (key, link, status, position, attempts, added, updated, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               list(merged.values()))
+        self._set_meta("key_scheme", "video_id")
+        self._conn.execute("COMMIT")
+
+    def _get_meta(self, name):
+        row = self._conn.execute("SELECT value FROM meta WHERE name=?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, name, value):
+        self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)", (name, str(value)))
+
+    # --- Kuyruk işlemleri ---
+    def enqueue_many(self, links, status=QUEUED):
+        """
+        Adds links whose video ID is not queued, processed or uploaded yet
+        (O(1) primary-key checks). Links are stored in canonical form.
+        Returns how many were added.
+        """
+        added = 0
+        now = time.time()
+        # Zaten yüklenmiş videolar yalnızca kuyruğa eklenirken elenir (done kayıtları yine de tutulur)
+        skip_uploaded = 1 if status == QUEUED else 0
+        with self._transaction() as conn:
+            position = conn.execute("SELECT COALESCE(MAX(position), 0) FROM links").fetchone()[0]
+            for link in links:
+                link = link.strip()
+                if not link: continue
+                key = self.key_for(link)
+                position += 1
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO links (key, link, status, position, added, updated)"
+                    " SELECT ?, ?, ?, ?, ?, ? WHERE NOT (? AND EXISTS (SELECT 1 FROM uploaded_ids WHERE video_id=?))",
+                    (key, canonical_url(link), status, position, now, now, skip_uploaded, key))
+                added += cur.rowcount
+        return added
+
+    def enqueue(self, link):
+        return self.enqueue_many([link]) == 1
+
+    def claim_next(self):
+        """
+        Atomically moves the oldest queued link to 'claimed' and returns it
+        (None if the queue is empty). Deferred links wait until their time.
+        """
+        with self._transaction() as conn:
+            row = conn.execute("SELECT key, link FROM links WHERE status=? AND not_before <= ? ORDER BY position LIMIT 1",
+                               (QUEUED, time.time())).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE links SET status=?, attempts=attempts+1, updated=? WHERE key=?", (CLAIMED, time.time(), row[0]))
+            return row[1]
+
+    def peek(self, limit):
+        """The next queued links in claim order, without claiming them."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT link FROM links WHERE status=? AND not_before <= ? ORDER BY position LIMIT ?",
+                (QUEUED, time.time(), limit))]
+
+    def defer(self, link, reason="", delay=3600):
+        """Puts a claimed link back without using up an attempt; it is not claimed again for delay seconds."""
+        with self._transaction() as conn:
+            conn.execute("UPDATE links SET status=?, attempts=MAX(attempts - 1, 0), error=?, not_before=?, updated=? WHERE key=?",
+                         (QUEUED, reason, time.time() + delay, time.time(), self.key_for(link)))
+
+    def complete(self, link):
+        self._set_status(link, DONE)
+
+    def fail(self, link, error=""):
+        self._set_status(link, FAILED, error)
+
+    def retry_or_fail(self, link, error="", max_attempts=3):
+        """
+        Puts a failed link back at the end of the queue while it has attempts
+        left, otherwise marks it failed. Returns (requeued, attempts so far).
+        """
+        key = self.key_for(link)
+        with self._transaction() as conn:
+            row = conn.execute("SELECT attempts FROM links WHERE key=?", (key,)).fetchone()
+            attempts = row[0] if row else 0
+            requeued = row is not None and attempts < max_attempts
+            if requeued:
+                position = conn.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM links").fetchone()[0]
+                conn.execute("UPDATE links SET status=?, position=?, error=?, updated=? WHERE key=?",
+                             (QUEUED, position, error, time.time(), key))
+            else:
+                conn.execute("UPDATE links SET status=?, error=?, updated=? WHERE key=?",
+                             (FAILED, error, time.time(), key))
+        return requeued, attempts
+
+    def _set_status(self, link, status, error=None):
+        with self._transaction() as conn:
+            conn.execute("UPDATE links SET status=?, error=?, updated=? WHERE key=?",
+                         (status, error, time.time(), self.key_for(link)))
+
+    def requeue_stale_claims(self):
+        """Links left 'claimed' by a crashed or stopped run go back to the queue (the attempt is given back)."""
+        with self._transaction() as conn:
+            return conn.execute("UPDATE links SET status=?, attempts=MAX(attempts - 1, 0), updated=? WHERE status=?",
+                                (QUEUED, time.time(), CLAIMED)).rowcount
+
+    def reset_completed(self):
+        """Makes done/failed links processable again (used when the used-links log is cleared)."""
+        with self._transaction() as conn:
+            return conn.execute("UPDATE links SET status=?, attempts=0, error=NULL, updated=? WHERE status IN (?, ?)",
+                                (QUEUED, time.time(), DONE, FAILED)).rowcount
+
+    def counts(self):
+        """Links per status, kept in memory and refreshed after every write (O(1))."""
+        with self._lock:
+            # Başka bir süreç (ör. CLI) yazdıysa data_version değişir
+            if self._conn.execute("PRAGMA data_version").fetchone()[0] != self._data_version:
+                self._reload_counts()
+            return dict(self._counts)
+
+    def remaining_count(self):
+        return self.counts()[QUEUED]
+
+    def links_with_status(self, *statuses):
+        marks = ",".join("?" * len(statuses))
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                f"SELECT link FROM links WHERE status IN ({marks}) ORDER BY position", statuses)]
+
+    def is_known(self, link):
+        """True if the link's video is already queued, processed or uploaded."""
+        key = self.key_for(link)
+        with self._lock:
+            return (self._conn.execute("SELECT 1 FROM links WHERE key=?", (key,)).fetchone() is not None or
+                    self._conn.execute("SELECT 1 FROM uploaded_ids WHERE video_id=?", (key,)).fetchone() is not None)
+
+    def sync_uploaded_log(self, uploaded_log_path):
+        """Adds the video IDs of uploader/uploaded_videos.log to the uploaded index (skipped if the file did not change)."""
+        path = Path(uploaded_log_path)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return 0
+        file_stat = (st.st_mtime_ns, st.st_size)
+        if file_stat == getattr(self, "_uploaded_log_stat", None):
+            return 0
+        ids = {video_id_from_output_path(line) for line in _read_lines(path)} - {None}
+        with self._transaction() as conn:
+            before = conn.execute("SELECT COUNT(*) FROM uploaded_ids").fetchone()[0]
+            conn.executemany("INSERT OR IGNORE INTO uploaded_ids (video_id) VALUES (?)", [(i,) for i in ids])
+            added = conn.execute("SELECT COUNT(*) FROM uploaded_ids").fetchone()[0] - before
+        self._uploaded_log_stat = file_stat
+        return added
+
+    def dedupe_links_file(self, links_file_path):
+        """
+        Rewrites link.txt with one canonical link per video ID, dropping
+        repeats and videos that were already uploaded. Returns
+        (removed duplicates, removed already-uploaded).
+        """
+        lines = _read_lines(links_file_path)
+        with self._lock:
+            uploaded = {row[0] for row in self._conn.execute("SELECT video_id FROM uploaded_ids")}
+        seen, kept, duplicates, already_uploaded = set(), [], 0, 0
+        for line in lines:
+            key = self.key_for(line)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            if key in uploaded:
+                already_uploaded += 1
+            else:
+                kept.append(canonical_url(line))
+        _write_lines(links_file_path, kept)
+        self._links_file_watch = None
+        return duplicates, already_uploaded
+
+    # --- Metin dosyaları ile uyumluluk ---
+    def import_text_files(self, links_file_path, used_links_file_path):
+        """
+        One-time import of the old text files: used_link.txt entries are
+        recorded as done (only on the first import), then link.txt is synced.
+        """
+        with self._lock:
+            first_import = self._get_meta("imported_text_files") is None
+        if first_import and used_links_file_path:
+            self.enqueue_many(_read_lines(used_links_file_path), status=DONE)
+            with self._transaction():
+                self._set_meta("imported_text_files", time.time())
+        return self.sync_links_file(links_file_path, force=True)
+
+    def sync_links_file(self, links_file_path, force=False):
+        """
+        Enqueues new lines of link.txt. The file is only stat'ed (at most once
+        per check_interval seconds); when it just grew, only the appended
+        bytes are read. Any other edit triggers a full re-read, which also
+        drops queued (or deferred) links that were removed from the file.
+        """
+        path = Path(links_file_path)
+        now = time.monotonic()
+        watch = self._links_file_watch
+        if not force and watch and watch["path"] == path and now - watch["checked"] < self.check_interval:
+            return 0
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return 0
+
+        if not force and watch and watch["path"] == path:
+            watch["checked"] = now
+            if (st.st_mtime_ns, st.st_size) == watch["stat"]:
+                return 0
+            if st.st_size >= watch["offset"] and self._tail_unchanged(path, watch):
+                return self._read_appended(path, watch, st)
+
+        with open(path, 'rb') as f:
+            data = f.read()
+        return self._consume(path, data, 0, st, now)
+
+    def _tail_unchanged(self, path, watch):
+        # Son okunan konumdan önceki baytlar aynıysa dosyaya sadece ekleme yapılmıştır
+        start = max(0, watch["offset"] - len(watch["tail"]))
+        with open(path, 'rb') as f:
+            f.seek(start)
+            return f.read(watch["offset"] - start) == watch["tail"]
+
+    def _read_appended(self, path, watch, st):
+        with open(path, 'rb') as f:
+            f.seek(watch["offset"])
+            data = f.read()
+        return self._consume(path, data, watch["offset"], st, watch["checked"], watch["tail"])
+
+    def _consume(self, path, data, base_offset, st, now, previous_tail=b""):
+        # Yarım kalan son satırı (henüz newline yok) bir sonraki okumaya bırak
+        end = data.rfind(b"\n") + 1
+        lines = data[:end].decode('utf-8', errors='replace').splitlines()
+        added = self.enqueue_many(lines)
+        if base_offset == 0:
+            # Tam okuma: dosyadan silinen linkler kuyruktan da çıkar (yarım son satır da dosyada sayılır)
+            self._drop_removed(lines + data[end:].decode('utf-8', errors='replace').splitlines())
+        offset = base_offset + end
+        tail = (previous_tail + data[:end])[-64:]
+        self._links_file_watch = {"path": path, "stat": (st.st_mtime_ns, st.st_size), "offset": offset,
+                                  "tail": tail, "checked": now}
+        return added
+
+    def _drop_removed(self, lines):
+        keys = {self.key_for(line) for line in lines if line.strip()}
+        with self._transaction() as conn:
+            removed = [row[0] for row in conn.execute("SELECT key FROM links WHERE status=?", (QUEUED,)) if row[0] not in keys]
+            conn.executemany("DELETE FROM links WHERE key=? AND status=?", [(key, QUEUED) for key in removed])
+        return len(removed)
+
+    def add_link(self, link, links_file_path):
+        """Appends a link to link.txt and enqueues it. Returns False if it was already known."""
+        added = self.enqueue(link)
+        if added:
+            with open(links_file_path, 'a', encoding='utf-8') as f: f.write(link.strip() + '\n')
+        return added
+
+    def export_text_files(self, links_file_path=None, used_links_file_path=None):
+        """Writes the queue back out as link.txt (every link) and used_link.txt (claimed/done/failed)."""
+        if links_file_path:
+            _write_lines(links_file_path, self.links_with_status(QUEUED, CLAIMED, DONE, FAILED))
+        if used_links_file_path:
+            _write_lines(used_links_file_path, self.links_with_status(CLAIMED, DONE, FAILED))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class _Transaction:
+    # BEGIN IMMEDIATE ... COMMIT/ROLLBACK, thread-safe; on_commit runs while the lock is held
+    def __init__(self, conn, lock, on_commit=None):
+        self.conn = conn
+        self.lock = lock
+        self.on_commit = on_commit
+
+    def __enter__(self):
+        self.lock.acquire()
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+            if self.on_commit: self.on_commit()
+        finally:
+            self.lock.release()
+        return False
+
+def _write_lines(filepath, lines):
+    # Önce geçici dosyaya yaz, sonra atomik olarak değiştir
+    path = Path(filepath)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for line in lines: f.write(line + '\n')
+    tmp_path.replace(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Link queue maintenance")
+    parser.add_argument("command", choices=["import", "export", "count", "dedupe"])
+    parser.add_argument("--links", default="creator/link.txt")
+    parser.add_argument("--used", default="creator/used_link.txt")
+    parser.add_argument("--uploaded", default="uploader/uploaded_videos.log")
+    parser.add_argument("--db", help="Queue database (default: next to the links file)")
+    args = parser.parse_args(argv)
+
+    queue = LinkQueue(args.db or default_queue_path(args.links))
+    if args.command == "import":
+        queue.sync_uploaded_log(args.uploaded)
+        print(f"Imported {queue.import_text_files(args.links, args.used)} new link(s).")
+    elif args.command == "dedupe":
+        queue.sync_uploaded_log(args.uploaded)
+        duplicates, already_uploaded = queue.dedupe_links_file(args.links)
+        print(f"Removed {duplicates + already_uploaded} redundant job(s) from {args.links}: "
+              f"{duplicates} duplicate(s), {already_uploaded} already uploaded.")
+    elif args.command == "export":
+        queue.export_text_files(args.links, args.used)
+        print(f"Exported queue to {args.links} and {args.used}.")
+    print(f"Queue: {queue.counts()}")
+    queue.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# Automation/creator/manifest.py
+# Per-video checkpoint file (output_dir/<video_id>/manifest.json). Every
+# finished step (download, metadata per language, encode per language,
+# upload per language) is recorded together with the size and hash of the
+# files it produced, so a retried or resumed job skips intact steps.
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+
+_write_lock = threading.RLock()
+
+
+def _sha1(path, chunk_size=1024 * 1024):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def file_record(path, base_dir=None):
+    """Size, mtime and SHA-1 of a file; the path is stored relative to base_dir when possible."""
+    path = Path(path)
+    st = path.stat()
+    stored = str(path)
+    if base_dir is not None:
+        try:
+            stored = path.resolve().relative_to(Path(base_dir).resolve()).as_posix()
+        except ValueError:
+            pass
+    return {"path": stored, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": _sha1(path)}
+
+def verify_record(record, base_dir=None):
+    """
+    True if the recorded file still exists with the same size and content.
+    An unchanged mtime is trusted; otherwise the file is hashed again.
+    """
+    if not record:
+        return False
+    path = resolve_record_path(record, base_dir)
+    try:
+        st = path.stat()
+    except OSError:
+        return False
+    if st.st_size == 0 or st.st_size != record.get("size"):
+        return False
+    if st.st_mtime_ns == record.get("mtime_ns"):
+        return True
+    return _sha1(path) == record.get("sha1")
+
+def resolve_record_path(record, base_dir=None):
+    path = Path(record["path"])
+    if not path.is_absolute() and base_dir is not None:
+        path = Path(base_dir) / path
+    return path
+
+
+class VideoManifest:
+    def __init__(self, video_dir, video_id=None):
+        self.dir = Path(video_dir)
+        self.path = self.dir / MANIFEST_NAME
+        self._lock = threading.RLock()
+        self._hash_cache = {}
+        self.data = self._load()
+        if video_id:
+            self.data["video_id"] = video_id
+
+    def _load(self):
+        empty = {"version": MANIFEST_VERSION, "video_id": None, "attempts": 0, "errors": [],
+                 "download": None, "quote": None, "metadata": {}, "encoded": {}, "uploaded": {}}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        if data.get("version") != MANIFEST_VERSION:
+            return empty
+        return {**empty, **data}
+
+    def save(self):
+        with self._lock, _write_lock:
+            self.dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(f"{MANIFEST_NAME}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.data, f, indent=2, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+
+    def _record(self, path):
+        # Aynı dosyaya (master/hardlink) birden çok dil işaret edebilir: tek kez hash'le
+        key = str(Path(path).resolve())
+        if key not in self._hash_cache:
+            self._hash_cache[key] = file_record(path, self.dir)
+        return dict(self._hash_cache[key])
+
+    def record_attempt(self, error=None):
+        with self._lock:
+            self.data["attempts"] += 1
+            if error:
+                self.data["errors"] = (self.data["errors"] + [{"time": time.time(), "error": str(error)}])[-10:]
+            self.save()
+
+    # --- İndirme ---
+    def record_download(self, video_path, info_json_path=None):
+        with self._lock:
+            self.data["download"] = {
+                "video": self._record(video_path),
+                "info_json": self._record(info_json_path) if info_json_path and Path(info_json_path).exists() else None,
+                "time": time.time(),
+            }
+            self.save()
+
+    def verified_download(self):
+        """(video path, info json path or None) if the recorded download is intact, else None."""
+        download = self.data.get("download")
+        if not download or not verify_record(download.get("video"), self.dir):
+            return None
+        info_json = download.get("info_json")
+        info_path = resolve_record_path(info_json, self.dir) if verify_record(info_json, self.dir) else None
+        return resolve_record_path(download["video"], self.dir), info_path
+
+    # --- Metadata ---
+    def record_quote(self, quote):
+        with self._lock:
+            self.data["quote"] = quote
+            self.save()
+
+    def record_metadata(self, lang_key, metadata, overlay_text):
+        with self._lock:
+            self.data["metadata"][lang_key] = {"seo": metadata, "overlay_text": overlay_text}
+            self.save()
+
+    def metadata_for(self, lang_key):
+        return self.data["metadata"].get(lang_key)
+
+    # --- Encode ---
+    def record_encoded(self, lang_key, video_path, overlay_text, upload_key=None, stats=None):
+        with self._lock:
+            self.data["encoded"][lang_key] = {"file": self._record(video_path), "overlay_text": overlay_text,
+                                              "upload_key": upload_key, "stats": stats}
+            self.save()
+
+    def verified_encode(self, lang_key, overlay_text):
+        """The encode record of lang_key if it was made with the same overlay text and its file is intact."""
+        entry = self.data["encoded"].get(lang_key)
+        if not entry or entry.get("overlay_text") != overlay_text or not verify_record(entry.get("file"), self.dir):
+            return None
+        return entry
+
+    def encoded_path(self, entry):
+        return resolve_record_path(entry["file"], self.dir)
+
+    # --- Yükleme ---
+    def is_uploaded(self, lang_key):
+        return lang_key in self.data["uploaded"]
+
+
+def mark_uploaded(manifest_path, lang_key, youtube_video_id):
+    """Records a finished upload in a manifest on disk (called from the uploader thread)."""
+    with _write_lock:
+        manifest = VideoManifest(Path(manifest_path).parent)
+        manifest.data["uploaded"][lang_key] = {"youtube_id": youtube_video_id, "time": time.time()}
+        manifest.save()
@@ -0,0 +1,124 @@
+# Automation/creator/output_profile.py
+# Picks the output resolution, frame rate and bitrate of an encode from the
+# source's own properties (read with ffprobe) within configurable ceilings:
+# a 720p/30 source stays 720x1280@30 instead of being upscaled to 1440x2560
+# with every frame duplicated to 60 fps. Probe results are cached by file
+# path, size and mtime, so retries and multi-language encodes probe once.
+
+import json
+import subprocess
+from collections import namedtuple
+from pathlib import Path
+
+from creator.cache_store import make_key
+
+# encoder/rate_control/crf: encoders.py kaydındaki encoder ve hız kontrol modu (None = arayüzdeki donanım seçimi)
+OutputProfile = namedtuple("OutputProfile", ["width", "height", "fps", "rate", "bitrate_k", "maxrate_k", "bufsize_k",
+                                             "encoder", "rate_control", "crf"], defaults=(None, "bitrate", None))
+
+# Eski sabit profil: 2K dikey, 60fps, 15 Mbit/s
+DEFAULT_PROFILE = OutputProfile(1440, 2560, 60.0, "60", 15000, 20000, 30000)
+
+DEFAULT_CEILINGS = {
+    "enabled": True,
+    "max_height": 2560,       # 9:16 tuval; genişlik yükseklikten hesaplanır
+    "min_height": 0,          # > 0 ise küçük kaynaklar bu yüksekliğe büyütülür
+    "max_fps": 60,
+    "bits_per_pixel": 0.07,   # bitrate = genişlik * yükseklik * fps * bpp
+    "min_bitrate_k": 2500,
+    "max_bitrate_k": 15000,
+    "source_bitrate_factor": 2.0,  # kaynağın bitrate'inin en fazla bu katı (0 = sınır yok)
+}
+
+
+def parse_rate(value):
+    """'30000/1001' or '30' -> float (0.0 if unknown)."""
+    try:
+        num, _, den = str(value).partition("/")
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+def _rotation(stream):
+    rotation = (stream.get("tags") or {}).get("rotate")
+    for side_data in stream.get("side_data_list") or []:
+        if "rotation" in side_data:
+            rotation = side_data["rotation"]
+    try:
+        return abs(int(float(rotation or 0))) % 180
+    except ValueError:
+        return 0
+
+def run_ffprobe(path):
+    cmd = ['ffprobe', '-v', 'error', '-show_entries',
+           'stream=codec_type,codec_name,width,height,avg_frame_rate,r_frame_rate,bit_rate:'
+           'stream_tags=rotate:stream_side_data=rotation:format=duration,bit_rate', '-of', 'json', str(path)]
+    data = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    width, height = video.get("width") or 0, video.get("height") or 0
+    if _rotation(video) == 90:
+        width, height = height, width
+    fps_text = video.get("avg_frame_rate") if parse_rate(video.get("avg_frame_rate")) else video.get("r_frame_rate")
+    fmt = data.get("format", {})
+    return {
+        "width": width, "height": height,
+        "fps": parse_rate(fps_text), "rate": fps_text or "",
+        "vcodec": video.get("codec_name") or "", "acodec": audio.get("codec_name") if audio else None,
+        "video_bitrate": int(video.get("bit_rate") or fmt.get("bit_rate") or 0),
+        "duration": float(fmt.get("duration") or 0),
+    }
+
+def probe_source(path, cache=None):
+    """ffprobe summary of path (see run_ffprobe); cached by path, size and mtime when a cache is given."""
+    path = Path(path)
+    st = path.stat()
+    key = make_key(str(path.resolve()), st.st_size, st.st_mtime_ns)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    probe = run_ffprobe(path)
+    if cache is not None:
+        cache.put(key, probe)
+    return probe
+
+
+def choose_profile(probe, ceilings=None):
+    """OutputProfile for a probed source within the ceilings (DEFAULT_CEILINGS keys)."""
+    rules = {**DEFAULT_CEILINGS, **(ceilings or {})}
+    if not probe or not probe.get("height"):
+        return DEFAULT_PROFILE
+
+    # Çıktı 9:16 tuvaldir: kaynağın detayını kaybetmeyecek en küçük yükseklik (tavana kadar, büyütmeden)
+    needed = max(probe["height"], round(probe["width"] * 16 / 9))
+    height = min(rules["max_height"], max(rules["min_height"], needed))
+    # 32'nin katı yükseklik -> genişlik (h * 9 / 16) tam ve çift olur; yuv420p tek boyutu encode edemez
+    height = max(32, height // 32 * 32)
+    width = height * 9 // 16
+
+    if 0 < probe["fps"] <= rules["max_fps"] + 0.01:
+        fps, rate = probe["fps"], probe["rate"]
+    else:
+        fps, rate = float(rules["max_fps"]), str(rules["max_fps"])
+
+    bitrate = width * height * fps * rules["bits_per_pixel"] / 1000
+    if rules["source_bitrate_factor"] and probe.get("video_bitrate"):
+        # Kaynakta olmayan detay için bit harcama
+        bitrate = min(bitrate, probe["video_bitrate"] / 1000 * rules["source_bitrate_factor"])
+    bitrate = int(min(rules["max_bitrate_k"], max(rules["min_bitrate_k"], bitrate)))
+    return OutputProfile(width, height, fps, rate, bitrate, bitrate * 4 // 3, bitrate * 2)
+
+def describe(profile, probe=None):
+    text = f"{profile.width}x{profile.height}@{profile.fps:g} | {profile.bitrate_k}k"
+    if profile.rate_control != "bitrate":
+        text += f" {profile.rate_control}" + (f" {profile.crf}" if profile.crf is not None and "crf" in profile.rate_control else "")
+    if probe:
+        text += f" (source {probe['width']}x{probe['height']}@{probe['fps']:.4g} {probe['vcodec']})"
+    return text
+
+def matches_profile(probe, profile):
+    """True if the source is H.264 already at the profile's size and frame rate (stream copy is enough)."""
+    return (bool(probe) and probe.get("vcodec") == "h264" and probe["width"] == profile.width
+            and probe["height"] == profile.height and abs(probe["fps"] - profile.fps) < 0.01)
@@ -0,0 +1,98 @@
+# Automation/creator/overlay.py
+# Renders the caption box once with PIL into a transparent PNG. ffmpeg then
+# composites that image with its `overlay` filter, instead of rasterizing the
+# text with drawtext on every frame (and without drawtext's escaping issues).
+# The drawtext fallback reads the caption from a text file for the same reason.
+
+import hashlib
+import threading
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+
+from creator import layout
+
+OVERLAY_CACHE_DIR = Path(__file__).parent / "overlay_cache"
+
+# drawtext ile aynı görünüm: beyaz yazı, %50 siyah kutu, 15px kenar boşluğu
+TEXT_COLOR = (255, 255, 255, 255)
+BOX_COLOR = (0, 0, 0, 128)
+BOX_BORDER = 15
+STYLE_VERSION = "v1"  # Görünüm değişirse eski önbellek dosyaları kullanılmasın
+
+_rendered = {}
+_lock = threading.Lock()
+
+
+def _cache_key(text, frame_width, frame_height, font_path):
+    raw = "\x00".join([STYLE_VERSION, text, str(frame_width), str(frame_height), str(Path(font_path).resolve())])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def render_caption(text, frame_width, frame_height, font_path=layout.DEFAULT_FONT_PATH):
+    """Returns (RGBA image, caption layout) for the caption box, sized to its content."""
+    caption = layout.fit_caption(text, frame_width, frame_height, font_path)
+    font = layout.get_font(font_path, caption.font_size)
+    wrapped_text = "\n".join(caption.lines)
+
+    probe = ImageDraw.Draw(Image.new("RGBA", (1, 1)))
+    left, top, right, bottom = probe.multiline_textbbox((0, 0), wrapped_text, font=font, align="center")
+    box_w = (right - left) + 2 * BOX_BORDER
+    box_h = (bottom - top) + 2 * BOX_BORDER
+
+    image = Image.new("RGBA", (box_w, box_h), BOX_COLOR)
+    draw = ImageDraw.Draw(image)
+    draw.multiline_text((BOX_BORDER - left, BOX_BORDER - top), wrapped_text, font=font, fill=TEXT_COLOR, align="center")
+    return image, caption
+
+def render_caption_image(text, frame_width, frame_height, font_path=layout.DEFAULT_FONT_PATH, cache_dir=OVERLAY_CACHE_DIR):
+    """
+    Renders the caption to a PNG and returns (path, caption layout). Results
+    are cached by (text, frame size, font) in memory and on disk.
+    """
+    key = _cache_key(text, frame_width, frame_height, font_path)
+    with _lock:
+        if key in _rendered and _rendered[key][0].exists():
+            return _rendered[key]
+
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"caption_{key}.png"
+    caption = layout.fit_caption(text, frame_width, frame_height, font_path)
+    if not path.exists():
+        image, caption = render_caption(text, frame_width, frame_height, font_path)
+        tmp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp.png")
+        image.save(tmp_path)
+        tmp_path.replace(path)
+
+    with _lock:
+        _rendered[key] = (path, caption)
+    return path, caption
+
+def overlay_filter(input_label, image_label, output_label):
+    # PNG tek kare; overlay son kareyi tekrar ettiği için video boyunca kalır
+    return f"[{input_label}][{image_label}]overlay=x=(W-w)/2:y=(H-h)/2[{output_label}]"
+
+
+def _filter_path(path):
+    # Filtre seçeneği içinde tırnaklı yol: Windows sürücü harfindeki ':' kaçırılır
+    return str(Path(path).resolve()).replace('\\', '/').replace(':', '\\:')
+
+def drawtext_filter(text, frame_width, frame_height, font_path=layout.DEFAULT_FONT_PATH, cache_dir=OVERLAY_CACHE_DIR):
+    """
+    Returns (drawtext filter, caption layout) with the same look as the PNG
+    overlay. The wrapped caption is read from a cached text file with
+    expansion=none, so quotes, colons, % and backslashes need no escaping.
+    """
+    caption = layout.fit_caption(text, frame_width, frame_height, font_path)
+    wrapped_text = "\n".join(caption.lines)
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    path = cache_dir / f"caption_{_cache_key(text, frame_width, frame_height, font_path)}.txt"
+    if not path.exists():
+        tmp_path = path.with_name(f"{path.stem}.{threading.get_ident()}.tmp.txt")
+        tmp_path.write_text(wrapped_text, encoding="utf-8")
+        tmp_path.replace(path)
+    drawtext = (f"drawtext=fontfile='{_filter_path(font_path)}':textfile='{_filter_path(path)}':expansion=none:"
+                f"fontcolor=white:fontsize={caption.font_size}:x=(w-text_w)/2:y=(h-text_h)/2:"
+                f"box=1:boxcolor=black@0.5:boxborderw={BOX_BORDER}")
+    return drawtext, caption
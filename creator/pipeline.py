@@ -0,0 +1,117 @@
+# Automation/creator/pipeline.py
+# Small staged-pipeline engine: every stage has its own worker threads and a
+# bounded queue in front of it, so different videos can sit in different stages
+# at the same time (link N+1 downloads while link N is encoding).
+
+import queue
+import threading
+import traceback
+
+_END = object()  # Kuyruk sonu işareti (sentinel)
+
+
+class Stage:
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers))
+
+
+class StagePipeline:
+    """
+    Runs items through a list of Stage objects.
+
+    Each stage function receives one item and returns the item for the next
+    stage; returning None drops it. Exceptions are passed to ``on_error`` and
+    the item is dropped. When ``stop_event`` is set, workers stop pulling new
+    items and queued items are discarded.
+    """
+
+    def __init__(self, stages, stop_event, queue_size=2, on_error=None, on_drop=None):
+        self.stages = stages
+        self.stop_event = stop_event
+        self.on_error = on_error
+        self.on_drop = on_drop
+        self.queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in stages]
+        self._alive = [stage.workers for stage in stages]
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                t = threading.Thread(target=self._worker, args=(index,), name=f"{stage.name}-{n + 1}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def put(self, item):
+        """Feeds an item into the first stage. Blocks while the queue is full; returns False if stopped."""
+        return self._put(0, item)
+
+    def close(self):
+        """No more input: lets the first stage drain and shut down in order."""
+        for _ in range(self.stages[0].workers):
+            self._put(0, _END, force=True)
+
+    def join(self):
+        for t in self._threads:
+            t.join()
+
+    def queue_depths(self):
+        return {stage.name: q.qsize() for stage, q in zip(self.stages, self.queues)}
+
+    def _put(self, index, item, force=False):
+        q = self.queues[index]
+        while True:
+            if self.stop_event.is_set() and not force:
+                return False
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                if force and self.stop_event.is_set():
+                    # Durdurulduysa kuyruğu boşaltıp sentinel'e yer aç
+                    self._discard(q)
+
+    def _discard(self, q):
+        while True:
+            try:
+                item = q.get_nowait()
+            except queue.Empty:
+                return
+            if item is not _END and self.on_drop:
+                self.on_drop(item)
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        q = self.queues[index]
+        is_last = index == len(self.stages) - 1
+        while True:
+            try:
+                item = q.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if item is _END:
+                break
+            if self.stop_event.is_set():
+                if self.on_drop: self.on_drop(item)
+                continue
+            try:
+                result = stage.func(item)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(stage.name, item, e, traceback.format_exc())
+                continue
+            if result is None:
+                if self.on_drop: self.on_drop(item)
+                continue
+            if not is_last and not self._put(index + 1, result):
+                if self.on_drop: self.on_drop(result)
+
+        # Bu aşamanın son işçisi çıkarken bir sonraki aşamayı kapat
+        with self._lock:
+            self._alive[index] -= 1
+            last_worker = self._alive[index] == 0
+        if last_worker and not is_last:
+            for _ in range(self.stages[index + 1].workers):
+                self._put(index + 1, _END, force=True)
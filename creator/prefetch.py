@@ -0,0 +1,160 @@
+# Automation/creator/prefetch.py
+# Lookahead downloads: while the pipeline works on the current videos, the
+# next few queued links are downloaded in the background into the source
+# cache, so the download stage usually finds its source already on disk.
+# Prefetched-but-unused sources and partial downloads count against a disk
+# cap; prefetching also pauses when the disk is nearly full.
+
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from creator.link_queue import get_video_id
+from creator.preflight import ACCEPT
+
+
+class _Emitter:
+    def __init__(self, func=None):
+        self.func = func
+
+    def emit(self, *args):
+        if self.func: self.func(*args)
+
+
+class _QuietSignals:
+    """WorkerSignals stand-in for background downloads: logs are prefixed, progress is dropped."""
+    def __init__(self, log):
+        self.log_message = _Emitter(lambda msg: log(f"[prefetch] {msg}") if log else None)
+        self.progress = _Emitter()
+
+
+class Prefetcher:
+    def __init__(self, source_cache, download, window=2, max_bytes=0, min_free_bytes=0,
+                 preflight=None, log=None, on_status=None, status_interval=1.0):
+        """
+        download(link, signals, cancel_event) must download link into
+        source_cache and give up once cancel_event is set.
+        on_status(depth, bytes_in_flight) is called when either changes.
+        """
+        self.source_cache = source_cache
+        self.download = download
+        self.window = window
+        self.max_bytes = max_bytes
+        self.min_free_bytes = min_free_bytes
+        self.preflight = preflight
+        self.log = log
+        self.on_status = on_status
+        self.status_interval = status_interval
+        self._signals = _QuietSignals(log)
+        self._executor = ThreadPoolExecutor(max_workers=max(1, window), thread_name_prefix="prefetch")
+        self._tasks = {}      # video_id -> Future (indirme sürüyor)
+        self._ready = set()   # indirildi, henüz iş tarafından alınmadı
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        self._last_status = None
+        self._monitor = threading.Thread(target=self._monitor_loop, name="prefetch-status", daemon=True)
+        self._monitor.start()
+
+    # --- Durum ---
+    def status(self):
+        """(prefetch depth, bytes on disk for running + ready prefetches)."""
+        with self._lock:
+            video_ids = list(self._tasks) + list(self._ready)
+        return len(video_ids), sum(self.source_cache.entry_bytes(video_id) for video_id in video_ids)
+
+    def _emit_status(self):
+        status = self.status()
+        if status != self._last_status:
+            self._last_status = status
+            if self.on_status: self.on_status(*status)
+
+    def _monitor_loop(self):
+        while not self._closed.wait(self.status_interval):
+            self._emit_status()
+
+    def _has_room(self):
+        if self.min_free_bytes:
+            try:
+                if shutil.disk_usage(self.source_cache.cache_dir).free < self.min_free_bytes:
+                    return False
+            except OSError:
+                pass
+        return not self.max_bytes or self.status()[1] < self.max_bytes
+
+    # --- Önden indirme ---
+    def update(self, upcoming_links, min_height=None):
+        """Starts background downloads for the first links of the window that are not on disk yet."""
+        if self._closed.is_set() or self.window <= 0:
+            return
+        for link in upcoming_links[:self.window]:
+            video_id = get_video_id(link)
+            if not video_id:
+                continue
+            with self._lock:
+                if video_id in self._tasks or video_id in self._ready or len(self._tasks) >= self.window:
+                    continue
+            if self.source_cache.has(video_id, min_height) or not self._has_room():
+                continue
+            with self._lock:
+                # İş başlayana kadar kaynak LRU temizliğinden korunur
+                self.source_cache.pin(video_id)
+                self._tasks[video_id] = self._executor.submit(self._run, link, video_id)
+        self._emit_status()
+
+    def _run(self, link, video_id):
+        ok = False
+        try:
+            if self.preflight is not None:
+                # Reddedilecek bir video için bant genişliği harcama
+                result = self.preflight.peek(link, self._closed)
+                if result is None or result[0] != ACCEPT:
+                    return False
+            ok = bool(self.download(link, self._signals, self._closed))
+            return ok
+        except Exception as e:
+            if self.log: self.log(f"[prefetch] ⚠️ {link}: {e}")
+            return False
+        finally:
+            with self._lock:
+                self._tasks.pop(video_id, None)
+                if ok: self._ready.add(video_id)
+                else: self.source_cache.unpin(video_id)
+            self._emit_status()
+
+    def wait_for(self, link, stop_event=None, poll_interval=0.2):
+        """
+        If link is being prefetched, waits until that download finishes so the
+        caller finds it in the source cache instead of downloading it twice.
+        """
+        video_id = get_video_id(link)
+        with self._lock:
+            future = self._tasks.get(video_id)
+        while future is not None and not future.done():
+            if stop_event is not None and stop_event.is_set():
+                return
+            _wait(future, poll_interval)
+
+    def release(self, link):
+        """The job has taken over (and pinned) the source: stop counting it as prefetched."""
+        video_id = get_video_id(link)
+        with self._lock:
+            if video_id in self._ready:
+                self._ready.discard(video_id)
+                self.source_cache.unpin(video_id)
+        self._emit_status()
+
+    def shutdown(self):
+        self._closed.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            for video_id in self._ready:
+                self.source_cache.unpin(video_id)
+            self._ready.clear()
+        if self.on_status: self.on_status(0, 0)
+
+
+def _wait(future, timeout):
+    try:
+        future.exception(timeout=timeout)
+    except Exception:
+        pass
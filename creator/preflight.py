@@ -0,0 +1,145 @@
+# Automation/creator/preflight.py
+# Metadata-only check of upcoming links before any media is downloaded.
+# yt-dlp's extract_info(download=False) runs on a thread pool for the next
+# few queued links; clips that break the rules (too long, landscape, too
+# small, private/removed) are rejected, live or temporarily unreachable ones
+# are deferred. The fetched info is kept so the real download reuses it
+# instead of extracting it again.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+import yt_dlp
+
+ACCEPT, REJECT, DEFER = "accept", "reject", "defer"
+
+DEFAULT_RULES = {
+    "enabled": True,
+    "batch_size": 8,           # Kaç link önceden kontrol edilsin
+    "workers": 4,
+    "max_duration": 180,       # saniye (Shorts sınırı); 0 = sınırsız
+    "min_height": 720,         # kaynağın en yüksek çözünürlüğü; 0 = sınırsız
+    "max_aspect_ratio": 1.0,   # genişlik / yükseklik; 1.0 = kare veya dikey
+    "defer_seconds": 3600,     # ertelenen link ne kadar sonra tekrar denensin
+    "info_ttl": 1800,          # format URL'leri zamanla geçersiz olur
+}
+
+# Bu hatalar kalıcıdır: link tekrar denenmez
+_PERMANENT_ERRORS = ("private video", "video unavailable", "this video is not available", "has been removed",
+                     "account associated", "terminated", "copyright", "sign in to confirm your age")
+_BLOCKED_AVAILABILITY = {"private", "premium_only", "subscriber_only", "needs_auth"}
+
+
+def evaluate(info, rules):
+    """(verdict, reason) for an extracted info dict."""
+    if info.get("live_status") in ("is_live", "is_upcoming", "post_live"):
+        return DEFER, f"live status '{info['live_status']}'"
+    if info.get("availability") in _BLOCKED_AVAILABILITY:
+        return REJECT, f"availability '{info['availability']}'"
+
+    duration = info.get("duration") or 0
+    if rules["max_duration"] and duration > rules["max_duration"]:
+        return REJECT, f"duration {duration:.0f}s > {rules['max_duration']}s"
+
+    heights = [f.get("height") or 0 for f in info.get("formats") or []] + [info.get("height") or 0]
+    if rules["min_height"] and max(heights) < rules["min_height"]:
+        return REJECT, f"max height {max(heights)}p < {rules['min_height']}p"
+
+    width, height = info.get("width"), info.get("height")
+    if rules["max_aspect_ratio"] and width and height and width / height > rules["max_aspect_ratio"]:
+        return REJECT, f"aspect ratio {width}x{height} is not vertical"
+    return ACCEPT, ""
+
+def classify_error(error):
+    message = str(error).lower()
+    if any(marker in message for marker in _PERMANENT_ERRORS):
+        return REJECT, str(error).splitlines()[0]
+    return DEFER, str(error).splitlines()[0]
+
+
+class Preflight:
+    def __init__(self, rules=None, ydl_opts=None):
+        self.rules = {**DEFAULT_RULES, **(rules or {})}
+        self.ydl_opts = {'quiet': True, 'no_warnings': True, 'skip_download': True, **(ydl_opts or {})}
+        self.stats = {ACCEPT: 0, REJECT: 0, DEFER: 0}
+        self._executor = ThreadPoolExecutor(max_workers=max(1, self.rules["workers"]), thread_name_prefix="preflight")
+        self._futures = {}
+        self._infos = {}
+        self._lock = threading.Lock()
+
+    def _check(self, link):
+        # Yaş extract_info'nun çalıştığı andan ölçülür (verdict/peek çağrısından değil)
+        fetched_at = time.monotonic()
+        try:
+            with yt_dlp.YoutubeDL(self.ydl_opts) as ydl:
+                info = ydl.extract_info(link, download=False)
+        except Exception as e:
+            return classify_error(e) + (None, fetched_at)
+        return evaluate(info, self.rules) + (info, fetched_at)
+
+    def _expired(self, fetched_at):
+        return time.monotonic() - fetched_at > self.rules["info_ttl"]
+
+    def prefetch(self, links):
+        """Starts the check for links that are not being checked yet."""
+        with self._lock:
+            for link in links:
+                if link not in self._futures:
+                    self._futures[link] = self._executor.submit(self._check, link)
+
+    def _result(self, link, stop_event=None, poll_interval=0.2):
+        # (verdict, reason, info, fetched_at); info_ttl'den eski sonuç atılır ve link yeniden kontrol edilir
+        while True:
+            self.prefetch([link])
+            with self._lock:
+                future = self._futures[link]
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    return None
+                try:
+                    result = future.result(timeout=poll_interval)
+                    break
+                except FutureTimeoutError:
+                    continue
+            if not self._expired(result[3]):
+                return result
+            with self._lock:
+                if self._futures.get(link) is future:
+                    del self._futures[link]
+
+    def peek(self, link, stop_event=None, poll_interval=0.2):
+        """Waits for the check of link and returns (verdict, reason, info) without consuming it; None if stopped."""
+        result = self._result(link, stop_event, poll_interval)
+        return result[:3] if result is not None else None
+
+    def verdict(self, link, stop_event=None, poll_interval=0.2):
+        """
+        Waits for the check of link and returns (verdict, reason). Accepted
+        links keep their info for take_info(). Returns None if stopped.
+        """
+        result = self._result(link, stop_event, poll_interval)
+        if result is None:
+            return None
+        verdict, reason, info, fetched_at = result
+        with self._lock:
+            self._futures.pop(link, None)
+            self.stats[verdict] += 1
+            if verdict == ACCEPT and info is not None:
+                self._infos[link] = (fetched_at, info)
+        return verdict, reason
+
+    def take_info(self, link):
+        """The info dict fetched during preflight (once), or None if there is none or it is too old."""
+        with self._lock:
+            entry = self._infos.pop(link, None)
+        if entry is None or self._expired(entry[0]):
+            return None
+        return entry[1]
+
+    def stats_line(self):
+        return (f"preflight: {self.stats[ACCEPT]} accepted, {self.stats[REJECT]} rejected, "
+                f"{self.stats[DEFER]} deferred")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
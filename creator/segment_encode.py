@@ -0,0 +1,144 @@
+# Automation/creator/segment_encode.py
+# Segment-parallel encoding for long sources: the video stream is split at
+# keyframes with a stream copy, every segment is encoded as its own ffmpeg
+# job in the encode slots, and the results are joined losslessly with the
+# concat demuxer. Audio is encoded once as a separate stream and muxed in at
+# the end. The joined file must match the source's duration and expected
+# frame count, otherwise the caller falls back to a single-process encode.
+
+import json
+import shutil
+import subprocess
+from pathlib import Path
+
+from creator.ffmpeg_progress import FFmpegError, run_with_progress
+
+MIN_SEGMENT_SECONDS = 5
+
+
+def probe_media(path):
+    """Video duration (s), video frame count and whether an audio stream exists, via ffprobe."""
+    cmd = ['ffprobe', '-v', 'error', '-count_packets', '-show_entries',
+           'format=duration:stream=codec_type,duration,nb_read_packets', '-of', 'json', str(path)]
+    data = json.loads(subprocess.run(cmd, check=True, capture_output=True, text=True).stdout)
+    streams = data.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), {})
+    return {
+        # Ses video'dan biraz uzun olabilir: mümkünse video akışının süresi
+        "duration": float(video.get("duration") or data.get("format", {}).get("duration") or 0),
+        "frames": int(video.get("nb_read_packets") or 0),
+        "has_audio": any(s.get("codec_type") == "audio" for s in streams),
+    }
+
+def segment_length(duration, slots, segment_seconds=0):
+    """Segment length that gives every slot work (segment_seconds > 0 is used as is)."""
+    if segment_seconds:
+        return segment_seconds
+    return max(MIN_SEGMENT_SECONDS, duration / max(1, slots))
+
+def check_output(output_info, source_duration, fps, segments):
+    """
+    (ok, reason). Each segment boundary may add or drop one frame when the
+    frame rate is converted, so the frame count tolerance grows with the
+    number of segments.
+    """
+    expected_frames = round(source_duration * fps)
+    tolerance = segments + 1
+    if abs(output_info["duration"] - source_duration) > tolerance / fps + 0.05:
+        return False, f"duration {output_info['duration']:.3f}s != source {source_duration:.3f}s"
+    if abs(output_info["frames"] - expected_frames) > tolerance:
+        return False, f"{output_info['frames']} frames, expected {expected_frames}±{tolerance}"
+    return True, ""
+
+
+def split_video(input_path, work_dir, seconds, registry=None):
+    """Stream-copies the video track into keyframe-aligned segments; returns their paths in order."""
+    pattern = Path(work_dir) / "src_%04d.mkv"
+    run_with_progress(['ffmpeg', '-y', '-i', str(input_path), '-map', '0:v:0', '-c', 'copy', '-f', 'segment',
+                       '-segment_time', f"{seconds:.3f}", '-reset_timestamps', '1', str(pattern)], registry=registry)
+    return sorted(Path(work_dir).glob("src_*.mkv"))
+
+def encode_audio(input_path, work_dir, registry=None):
+    audio_path = Path(work_dir) / "audio.m4a"
+    run_with_progress(['ffmpeg', '-y', '-i', str(input_path), '-map', '0:a:0', '-vn', '-c:a', 'aac', '-b:a', '192k',
+                       str(audio_path)], registry=registry)
+    return audio_path
+
+def concat_segments(segment_paths, audio_path, output_path, work_dir, registry=None):
+    list_path = Path(work_dir) / "segments.txt"
+    with open(list_path, 'w', encoding='utf-8') as f:
+        for path in segment_paths:
+            escaped = Path(path).resolve().as_posix().replace("'", "'\\''")
+            f.write(f"file '{escaped}'\n")
+    cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', str(list_path)]
+    if audio_path:
+        cmd += ['-i', str(audio_path), '-map', '0:v:0', '-map', '1:a:0']
+    cmd += ['-c', 'copy', '-movflags', '+faststart', str(output_path)]
+    run_with_progress(cmd, registry=registry)
+
+
+def encode_segmented(input_path, output_path, build_command, farm, work_dir, duration, fps, log,
+                     segment_seconds=0, on_segment_done=None):
+    """
+    Encodes input_path into output_path segment by segment.
+    build_command(segment_path, segment_output) returns the ffmpeg command
+    for one segment (video only). Returns a stats dict on success, None if
+    any step failed or the output did not pass the check.
+    """
+    work_dir = Path(work_dir)
+    shutil.rmtree(work_dir, ignore_errors=True)
+    work_dir.mkdir(parents=True)
+    try:
+        source = probe_media(input_path)
+        seconds = segment_length(source["duration"] or duration, farm.slots, segment_seconds)
+        segments = split_video(input_path, work_dir, seconds, farm)
+        if len(segments) < 2:
+            log(f"ℹ️ Source has too few keyframes to split ({len(segments)} segment); encoding in one piece.")
+            return None
+        log(f"✂️ Encoding {Path(output_path).name} in {len(segments)} segments of ~{seconds:.0f}s.")
+
+        outputs = [work_dir / f"enc_{i:04d}.mkv" for i in range(len(segments))]
+        audio_future, futures, errors = None, [], []
+        try:
+            if source["has_audio"]:
+                audio_future = farm.submit(encode_audio, input_path, work_dir, farm)
+            for segment, output in zip(segments, outputs):
+                futures.append(farm.submit(run_with_progress, build_command(segment, output), registry=farm))
+        except Exception as e:
+            errors.append(e)
+        # Hata ne olursa olsun kuyruğa giren her iş bitmeden çalışma klasörü silinmez
+        # (iptal edilen iş farm'ın sayaçlarını bozar, bu yüzden beklenir)
+        for i, future in enumerate(futures):
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+            if on_segment_done: on_segment_done(i + 1, len(futures))
+        audio_path = None
+        if audio_future is not None:
+            try:
+                audio_path = audio_future.result()
+            except Exception as e:
+                errors.append(e)
+        if errors:
+            raise errors[0]
+        if farm.stopped:
+            return None
+
+        concat_segments(outputs, audio_path, output_path, work_dir, farm)
+        result = probe_media(output_path)
+        ok, reason = check_output(result, source["duration"] or duration, fps, len(segments))
+        if not ok:
+            log(f"⚠️ Segmented encode failed the check ({reason}); falling back to a single encode.")
+            Path(output_path).unlink(missing_ok=True)
+            return None
+        return {"segments": len(segments), "frames": result["frames"], "duration": result["duration"]}
+    except FFmpegError as e:
+        if not farm.stopped:
+            log(f"⚠️ Segmented encode failed (exit {e.returncode}); falling back to a single encode.\n{e.stderr_tail}")
+        return None
+    except (OSError, ValueError, subprocess.CalledProcessError) as e:
+        log(f"⚠️ Segmented encode failed ({e}); falling back to a single encode.")
+        return None
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
@@ -0,0 +1,161 @@
+# Automation/creator/source_cache.py
+# Downloaded sources keyed by video ID: <cache_dir>/<video_id>/<video_id>.mp4
+# plus yt-dlp's .info.json. A complete download gets a small marker with its
+# size and hash; later jobs reuse it without any network call. Optional LRU
+# eviction by total size removes the least recently used sources (only the
+# source files, never the encoded outputs living in the same folder).
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from creator.manifest import file_record, verify_record
+
+MARKER_NAME = "source.json"
+_SOURCE_SUFFIXES = (".mp4", ".mkv", ".webm", ".info.json", ".description")
+
+
+class SourceCache:
+    def __init__(self, cache_dir, max_bytes=0):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    def entry_dir(self, video_id):
+        return self.cache_dir / video_id
+
+    def _marker_path(self, video_id):
+        return self.entry_dir(video_id) / MARKER_NAME
+
+    # --- Okuma ---
+    def lookup(self, video_id, min_height=None):
+        """
+        Info dict of a complete local source for video_id (with
+        'downloaded_filepath' set), or None. Sources from before the cache
+        existed are accepted if yt-dlp left no partial files behind.
+        """
+        info = self._find(video_id, min_height)
+        with self._lock:
+            if info is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        self._touch(video_id)
+        return info
+
+    def has(self, video_id, min_height=None):
+        """True if a complete source is on disk (no statistics, no LRU update, no marker written)."""
+        return self._find(video_id, min_height, adopt=False) is not None
+
+    def _find(self, video_id, min_height=None, adopt=True):
+        entry_dir = self.entry_dir(video_id)
+        info_path = entry_dir / f"{video_id}.info.json"
+        try:
+            with open(info_path, 'r', encoding='utf-8') as f:
+                info = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        marker = self._read_marker(video_id)
+        if marker:
+            video_path = entry_dir / marker["video"]["path"]
+            if not verify_record(marker["video"], entry_dir):
+                return None
+        else:
+            video_path = entry_dir / f"{video_id}.{info.get('ext') or 'mp4'}"
+            if not video_path.exists() or video_path.stat().st_size == 0 or any(entry_dir.glob("*.part")):
+                return None
+            # Eski indirme işaretlenip önbelleğe alınır (record temizlik de yapar); has() sadece bakar
+            if adopt: self.record(video_id, video_path, None)
+        if min_height and (info.get('height') or 0) < min_height and (marker or {}).get("max_height", 0) < min_height:
+            # Daha düşük kalitede indirilmiş; istenen kalite için yeniden indir
+            return None
+
+        info['downloaded_filepath'] = str(video_path)
+        return info
+
+    def entry_bytes(self, video_id):
+        """Bytes of the source files (finished or partial) of video_id."""
+        entry_dir = self.entry_dir(video_id)
+        if not entry_dir.exists():
+            return 0
+        return sum(p.stat().st_size for p in entry_dir.iterdir() if p.is_file() and p.name.startswith(video_id))
+
+    def _read_marker(self, video_id):
+        try:
+            with open(self._marker_path(video_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # --- Yazma ---
+    def record(self, video_id, video_path, max_height):
+        """Marks a finished download as complete (size + hash) and applies the size limit."""
+        entry_dir = self.entry_dir(video_id)
+        marker = {"video": file_record(video_path, entry_dir), "max_height": max_height or 0, "accessed": time.time()}
+        self._write_marker(video_id, marker)
+        self.evict()
+
+    def _write_marker(self, video_id, marker):
+        tmp_path = self._marker_path(video_id).with_name(f"{MARKER_NAME}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(marker, f)
+        tmp_path.replace(self._marker_path(video_id))
+
+    def _touch(self, video_id):
+        marker = self._read_marker(video_id)
+        if marker:
+            marker["accessed"] = time.time()
+            self._write_marker(video_id, marker)
+
+    # --- Kullanımdaki kaynaklar silinmez ---
+    def pin(self, video_id):
+        with self._lock:
+            self._pinned[video_id] = self._pinned.get(video_id, 0) + 1
+
+    def unpin(self, video_id):
+        with self._lock:
+            if self._pinned.get(video_id, 0) <= 1: self._pinned.pop(video_id, None)
+            else: self._pinned[video_id] -= 1
+
+    # --- LRU temizliği ---
+    def _entries(self):
+        entries = []
+        if not self.cache_dir.exists():
+            return entries
+        for marker_path in self.cache_dir.glob(f"*/{MARKER_NAME}"):
+            entry_dir = marker_path.parent
+            try:
+                with open(marker_path, 'r', encoding='utf-8') as f:
+                    accessed = json.load(f).get("accessed", 0)
+            except (OSError, ValueError):
+                accessed = 0
+            files = [p for p in entry_dir.iterdir() if p.is_file() and p.name.startswith(entry_dir.name) and p.name.endswith(_SOURCE_SUFFIXES)]
+            entries.append((accessed, entry_dir.name, files, sum(p.stat().st_size for p in files)))
+        return entries
+
+    def evict(self):
+        """Deletes least recently used sources until the total is under max_bytes. Returns bytes freed."""
+        if not self.max_bytes:
+            return 0
+        entries = sorted(self._entries())
+        total = sum(size for *_, size in entries)
+        freed = 0
+        for _, video_id, files, size in entries:
+            if total <= self.max_bytes: break
+            with self._lock:
+                if video_id in self._pinned: continue
+            for path in files + [self._marker_path(video_id)]:
+                path.unlink(missing_ok=True)
+            total -= size
+            freed += size
+        return freed
+
+    def stats_line(self):
+        lookups = self.hits + self.misses
+        rate = (self.hits / lookups) if lookups else 0.0
+        return f"source cache: {self.hits}/{lookups} reused ({rate:.0%})"
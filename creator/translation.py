@@ -0,0 +1,109 @@
+# Automation/creator/translation.py
+# Translation layer on top of deep_translator: in-memory LRU + persistent
+# cache keyed by (text hash, source, target), deduplicated cache misses, and
+# concurrent translation to several target languages. GoogleTranslator has
+# no real batch endpoint (its translate_batch is one request per string), so
+# every distinct uncached string costs one request.
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from deep_translator import GoogleTranslator
+
+
+class Translator:
+    def __init__(self, persistent_cache=None, memory_size=2048, max_workers=8):
+        self.persistent_cache = persistent_cache
+        self.memory_size = memory_size
+        self.max_workers = max_workers
+        self.network_calls = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- Önbellek ---
+    @staticmethod
+    def _key(text, source, target):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{digest}:{source}:{target}"
+
+    def _lookup(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        if self.persistent_cache:
+            value = self.persistent_cache.get(key)
+            if value is not None:
+                self._remember(key, value)
+                return value
+        return None
+
+    def _remember(self, key, value, persist=False):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+        if persist and self.persistent_cache:
+            self.persistent_cache.put(key, value)
+
+    # --- Çeviri ---
+    def translate_batch(self, texts, target, source="auto", log=None, stats=None):
+        """
+        Translates a list of strings to target. Empty strings and source ==
+        target are passed through; cached strings never reach the network.
+        On failure the original text is returned for the failed items.
+        If a stats dict is given, stats[target] gets the bytes sent, the
+        network latency and the number of cache hits. network_calls counts
+        one request per uncached string.
+        """
+        results = list(texts)
+        misses = {}
+        target_stats = {"bytes": 0, "seconds": 0.0, "cached": 0, "skipped": source == target}
+        if stats is not None:
+            stats[target] = target_stats
+        for i, text in enumerate(texts):
+            if not text or not text.strip() or source == target:
+                continue
+            cached = self._lookup(self._key(text, source, target))
+            if cached is not None:
+                results[i] = cached
+                target_stats["cached"] += 1
+            else:
+                misses.setdefault(text, []).append(i)
+        if not misses:
+            return results
+
+        pending = list(misses)
+        target_stats["bytes"] = sum(len(text.encode("utf-8")) for text in pending)
+        started = time.perf_counter()
+        try:
+            translator = GoogleTranslator(source=source, target=target)
+            # Her metin ayrı bir istek; ilk hatada kalanlar orijinal metinle döner
+            for text in pending:
+                with self._lock:
+                    self.network_calls += 1
+                value = translator.translate(text)
+                if not value: continue
+                self._remember(self._key(text, source, target), value, persist=True)
+                for i in misses[text]:
+                    results[i] = value
+        except Exception as e:
+            if log: log(f"❌ Translation to '{target}' failed: {e}")
+        finally:
+            target_stats["seconds"] = time.perf_counter() - started
+        return results
+
+    def translate(self, text, target, source="auto", log=None):
+        return self.translate_batch([text], target, source, log)[0]
+
+    def translate_many(self, texts, targets, source="auto", log=None, stats=None):
+        """Translates the same list of strings into several targets concurrently: {target: [translations]}."""
+        targets = list(dict.fromkeys(targets))
+        if not targets: return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(targets)))) as executor:
+            futures = {target: executor.submit(self.translate_batch, texts, target, source, log, stats) for target in targets}
+            return {target: future.result() for target, future in futures.items()}
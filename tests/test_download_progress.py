@@ -0,0 +1,33 @@
+import threading
+
+import pytest
+
+from creator.download_progress import DownloadProgress, DownloadStalled, run_watched
+
+
+class _Signals:
+    class _Signal:
+        def emit(self, *args):
+            pass
+
+    progress = log_message = _Signal()
+
+
+def test_watchdog_stops_a_download_that_never_calls_the_hook():
+    progress = DownloadProgress(_Signals(), stall_timeout=0.2)
+    release = threading.Event()
+    with pytest.raises(DownloadStalled):
+        run_watched(lambda: release.wait(5), progress, poll_interval=0.05, grace=0)
+    assert progress.stalled
+    release.set()
+    with pytest.raises(DownloadStalled):
+        progress.retry_sleep(0)
+
+
+def test_watchdog_ignores_quiet_postprocessing():
+    progress = DownloadProgress(_Signals(), stall_timeout=0.1)
+    def download():
+        progress.postprocessor_hook({"status": "started"})
+        threading.Event().wait(0.3)
+        return "done"
+    assert run_watched(download, progress, poll_interval=0.05) == "done"
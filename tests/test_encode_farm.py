@@ -0,0 +1,13 @@
+from creator.encode_farm import HARDWARE_SESSIONS, outputs_per_command, plan_slots
+
+
+def test_hardware_outputs_stay_within_the_session_budget():
+    slots, _ = plan_slots(16, 0.0, hardware=True)
+    per_command = outputs_per_command(7, slots, hardware=True)
+    assert slots * per_command <= HARDWARE_SESSIONS
+    assert outputs_per_command(7, 2, hardware=False) == 7
+
+
+def test_hardware_slots_are_capped_by_sessions():
+    assert plan_slots(16, 0.0, slots=8, hardware=True, sessions=3)[0] == 3
+    assert outputs_per_command(7, 3, hardware=True, sessions=3) == 1
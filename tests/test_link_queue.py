@@ -0,0 +1,40 @@
+from creator.link_queue import LinkQueue
+
+LINKS = ["https://youtu.be/AAAAAAAAAAA", "https://youtu.be/BBBBBBBBBBB", "https://youtu.be/CCCCCCCCCCC"]
+
+
+def _queue(tmp_path):
+    links_file = tmp_path / "link.txt"
+    links_file.write_text("\n".join(LINKS) + "\n")
+    queue = LinkQueue(tmp_path / "queue.db")
+    queue.import_text_files(links_file, None)
+    return queue, links_file
+
+
+def test_links_removed_from_file_leave_the_queue(tmp_path):
+    queue, links_file = _queue(tmp_path)
+    queue.defer(queue.claim_next(), "not yet", 100)
+    links_file.write_text(LINKS[2] + "\n")
+    queue.sync_links_file(links_file, force=True)
+    assert queue.links_with_status("queued") == ["https://www.youtube.com/shorts/CCCCCCCCCCC"]
+    assert queue.remaining_count() == 1
+    queue.close()
+
+
+def test_claimed_links_survive_removal_from_file(tmp_path):
+    queue, links_file = _queue(tmp_path)
+    claimed = queue.claim_next()
+    links_file.write_text(LINKS[2] + "\n")
+    queue.sync_links_file(links_file, force=True)
+    assert queue.links_with_status("claimed") == [claimed]
+    queue.close()
+
+
+def test_requeued_stale_claims_keep_their_attempts(tmp_path):
+    queue, _ = _queue(tmp_path)
+    for _ in range(5):
+        queue.claim_next()
+        assert queue.requeue_stale_claims() == 1
+    link = queue.claim_next()
+    assert queue.retry_or_fail(link, "boom", max_attempts=3) == (True, 1)
+    queue.close()
@@ -0,0 +1,25 @@
+from creator.output_profile import DEFAULT_PROFILE, choose_profile
+
+
+def _probe(width, height, fps=30.0, rate="30"):
+    return {"width": width, "height": height, "fps": fps, "rate": rate, "vcodec": "h264",
+            "acodec": "aac", "video_bitrate": 0, "duration": 30}
+
+
+def test_480p_vertical_source_gets_even_dimensions():
+    profile = choose_profile(_probe(480, 854))
+    assert (profile.width, profile.height) == (468, 832)
+    assert profile.width % 2 == 0 and profile.height % 2 == 0
+
+
+def test_odd_sized_sources_always_give_even_dimensions():
+    for width, height in [(406, 720), (480, 854), (360, 640), (1080, 1080), (1920, 1080), (721, 1283)]:
+        profile = choose_profile(_probe(width, height))
+        assert profile.width % 2 == 0 and profile.height % 2 == 0
+        assert profile.width * 16 == profile.height * 9
+
+
+def test_common_sizes_are_kept_and_capped():
+    assert choose_profile(_probe(720, 1280))[:2] == (720, 1280)
+    assert choose_profile(_probe(1080, 1920))[:2] == (1080, 1920)
+    assert choose_profile(_probe(2160, 3840, 60, "60"))[:2] == (DEFAULT_PROFILE.width, DEFAULT_PROFILE.height)
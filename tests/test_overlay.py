@@ -0,0 +1,13 @@
+import re
+
+from creator import overlay
+
+
+def test_drawtext_caption_is_read_from_a_file(tmp_path):
+    caption = "You're 100% sure: it's C:\\done, [right]?"
+    drawtext, layout = overlay.drawtext_filter(caption, 1440, 2560, cache_dir=tmp_path)
+    textfile = re.search(r"textfile='([^']*)'", drawtext).group(1)
+    assert (tmp_path / textfile.rsplit("/", 1)[-1]).read_text(encoding="utf-8") == "\n".join(layout.lines)
+    # Tırnaklar dengeli kalır; yazı filtre zincirine hiç girmez
+    assert drawtext.count("'") == 4 and "You" not in drawtext
+    assert ":expansion=none:" in drawtext
@@ -0,0 +1,15 @@
+import json
+
+from creator.source_cache import MARKER_NAME, SourceCache
+
+
+def test_has_does_not_write_or_evict(tmp_path):
+    cache = SourceCache(tmp_path, max_bytes=1)
+    entry = tmp_path / "abcdefghijk"
+    entry.mkdir()
+    (entry / "abcdefghijk.info.json").write_text(json.dumps({"id": "abcdefghijk", "ext": "mp4"}))
+    (entry / "abcdefghijk.mp4").write_bytes(b"x" * 100)
+
+    assert cache.has("abcdefghijk")
+    assert not (entry / MARKER_NAME).exists()
+    assert (entry / "abcdefghijk.mp4").exists()
@@ -123,10 +123,19 @@ def do_upload(youtube_service, video_info, log_function, privacy_status="private
         return None
 
 
-def upload_videos(videos_to_upload, channel_configs, log_function, privacy_status="private"):
+def log_uploaded_video(upload_key):
+    """
+    Appends an uploaded video's key (its path) to the uploaded videos log.
+    """
+    with open(UPLOADED_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(upload_key + "\n")
+
+
+def upload_videos(videos_to_upload, channel_configs, log_function, privacy_status="private", on_uploaded=None):
     """
     Main function to orchestrate the immediate uploading of a list of videos.
-    Accepts privacy_status parameter.
+    Accepts privacy_status parameter. on_uploaded(video_info, youtube_video_id)
+    is called after every successful upload.
     """
     if not videos_to_upload:
         log_function("ℹ️ No videos in the upload queue.")
@@ -145,8 +154,10 @@ def upload_videos(videos_to_upload, channel_configs, log_function, privacy_statu
             log_function(f"⚠️ Skipping video with incomplete metadata: {video_info}")
             continue
 
-        if video_path in uploaded_videos_log:
-            log_function(f"ℹ️ Skipping already uploaded video: {Path(video_path).name}")
+        # Aynı master dosyayı paylaşan diller için kayıt anahtarı dil yoludur
+        upload_key = video_info.get("upload_key", video_path)
+        if upload_key in uploaded_videos_log:
+            log_function(f"ℹ️ Skipping already uploaded video: {Path(upload_key).name}")
             continue
 
         config = channel_configs.get(lang)
@@ -162,7 +173,8 @@ def upload_videos(videos_to_upload, channel_configs, log_function, privacy_statu
             video_id = do_upload(youtube, video_info, log_function, privacy_status)
 
             if video_id:
-                log_uploaded_video(video_path)
+                log_uploaded_video(upload_key)
+                if on_uploaded: on_uploaded(video_info, video_id)
 
         except FileNotFoundError as e:
             log_function(f"CRITICAL ERROR: {e}")